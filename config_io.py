@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Shared JSON helpers for config.json and the tool's other JSON files.
+
+Reads and writes go through orjson when it is installed, and writes replace
+the file atomically so an interrupted setup never leaves a truncated file.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+CONFIG_FILE = 'config.json'
+
+def loads(text) -> Any:
+    """Parse a JSON str or bytes, using orjson when it is installed."""
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+def dumps_line(obj) -> str:
+    """Serialize obj as one compact JSON line, newline included."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode() + "\n"
+    return json.dumps(obj) + "\n"
+
+def read_json(path: str = CONFIG_FILE) -> Dict:
+    """Load a JSON file, using orjson when it is installed."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+def write_json(path: str, data: Dict) -> None:
+    """Write a JSON file with 2-space indentation via a temp file and os.replace."""
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(data, indent=2).encode('utf-8')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+@contextmanager
+def edit_json(path: str = CONFIG_FILE) -> Iterator[Dict]:
+    """Read a JSON file once, yield it for editing, and write it back if the block succeeds."""
+    data = read_json(path)
+    yield data
+    write_json(path, data)
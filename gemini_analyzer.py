@@ -9,43 +9,198 @@ Provides AI-powered query analysis using Google's Gemini Pro API:
 - Cost-effective alternative to OpenAI
 """
 
+import asyncio
+import functools
+import hashlib
 import json
 import os
-from typing import Dict, List, Optional
-import google.generativeai as genai
+import re
+import sqlite3
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple, TypedDict
+
+from config_io import loads, read_json, write_json
+
+CACHE_FILE = 'gemini_cache.sqlite'
+CACHE_TTL_SECONDS = 24 * 60 * 60
+# Responses kept in memory; older ones are still served from the on-disk cache
+MEMORY_CACHE_SIZE = 512
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 4
+RETRYABLE_STATUS_CODES = {429, 500, 503, 504}
+# Bulk, non-interactive calls tolerate slow responses; give them a long deadline
+# instead of the SDK default so queued requests aren't abandoned and re-sent.
+BULK_REQUEST_OPTIONS = {'timeout': 900}
+ANALYSIS_CONTEXT_FILE = 'recent_analysis.json'
+
+# Line scanners for free-text Gemini responses, applied once to the whole text.
+_RECOMMENDATION_RE = re.compile(r'^[ \t]*((?:[1-9]\.|[•\-*]|(?i:create|alter|optimize)).*?)[ \t\r]*$', re.M)
+_INDEX_RE = re.compile(r'^.*CREATE INDEX.*$', re.M | re.I)
+_MAIN_ISSUE_RE = re.compile(r'^.*Why.*$', re.M)
+_SEVERITY_RE = re.compile(r'critical|high|low', re.I)
+_IMPROVEMENT_RE = re.compile(r'^.*(?:improvement|faster|reduce|optimize).*$', re.M | re.I)
+
+
+def _import_genai():
+    # Imported lazily rather than at module level: google.generativeai pulls in
+    # gRPC and protobuf, which CLI paths that never touch Gemini shouldn't pay for.
+    try:
+        import google.generativeai as genai
+    except ImportError as e:
+        raise ImportError("google-generativeai is required for Gemini analysis. Run: pip install google-generativeai") from e
+    return genai
+
+
+class AnalysisSchema(TypedDict):
+    """Structured response requested from Gemini for one analyzed query."""
+    severity: str
+    ai_analysis: str
+    indexes: List[str]
+    recommendations: List[str]
+    estimated_improvement: str
+
 
 class GeminiAnalyzer:
     """Gemini Pro-powered query analysis and recommendation engine."""
     
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
-        if not self.api_key:
-            raise ValueError("Gemini API key is required. Set GEMINI_API_KEY or pass api_key parameter.")
-        
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        self.system_prompts = {
-            'query_analysis': """You are an expert MySQL database performance consultant. Analyze the given query and provide detailed insights about:
+    system_prompts = {
+        'query_analysis': """You are an expert MySQL database performance consultant. Analyze the given query and provide detailed insights about:
 1. Why the query is slow (specific technical reasons)
 2. What indexes should be added (with CREATE INDEX statements)
 3. Query optimization opportunities
 4. Estimated performance improvement
 5. Best practices for this type of query""",
 
-            'conversational': """You are a helpful MySQL database performance expert. Answer questions about database optimization, query performance, and MySQL best practices with clear, technical explanations.""",
+        'conversational': """You are a helpful MySQL database performance expert. Answer questions about database optimization, query performance, and MySQL best practices with clear, technical explanations.""",
 
-            'recommendations': """You are a MySQL performance expert. Based on the query analysis, provide:
+        'recommendations': """You are a MySQL performance expert. Based on the query analysis, provide:
 1. Exact CREATE INDEX statements
 2. Query rewriting suggestions
 3. Configuration optimizations
-4. Performance monitoring advice"""
+4. Performance monitoring advice""",
+
+        'summary_report': """You are a senior database consultant. Generate a professional performance report."""
+    }
+    
+    _MAX_QUERY_CHARS = 2000
+    
+    def __init__(self, api_key: Optional[str] = None, cache_file: str = CACHE_FILE):
+        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        if not self.api_key:
+            raise ValueError("Gemini API key is required. Set GEMINI_API_KEY or pass api_key parameter.")
+        
+        genai = _import_genai()
+        self.models = self._make_models(self.api_key)
+        self._analysis_config = genai.GenerationConfig(
+            response_mime_type='application/json', response_schema=AnalysisSchema
+        )
+        self._batch_analysis_config = genai.GenerationConfig(
+            response_mime_type='application/json', response_schema=List[AnalysisSchema]
+        )
+        self._cache: 'OrderedDict[str, object]' = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_db = self._open_cache_db(cache_file)
+        self._ctx_cache: Optional[Tuple[int, str]] = None
+    
+    @classmethod
+    @functools.lru_cache(maxsize=4)
+    def _make_models(cls, api_key: str) -> Dict[str, object]:
+        """Build the per-prompt models once per API key, sharing their gRPC channels across instances."""
+        genai = _import_genai()
+        genai.configure(api_key=api_key)
+        # One model per prompt type, with the prompt as its system instruction, so the
+        # constant prefix is sent separately from the per-request content and can be
+        # reused server-side instead of being re-prefilled inside every prompt.
+        return {
+            purpose: genai.GenerativeModel('gemini-1.5-flash', system_instruction=prompt)
+            for purpose, prompt in cls.system_prompts.items()
         }
     
-    def analyze_query(self, query: str, metrics: Dict) -> Dict:
+    def close(self) -> None:
+        """Release the on-disk response cache; the shared models stay alive for other instances."""
+        if self._cache_db is not None:
+            self._cache_db.close()
+            self._cache_db = None
+    
+    @staticmethod
+    def _cache_key(*parts: str) -> str:
+        """Hash the exact request inputs into a cache key."""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _metrics_key(metrics: Dict) -> str:
+        return str(sorted((k, round(v, 4) if isinstance(v, float) else v) for k, v in metrics.items()))
+    
+    def _open_cache_db(self, cache_file: Optional[str]) -> Optional[sqlite3.Connection]:
+        """Open the on-disk response cache so warm restarts still hit."""
+        if not cache_file:
+            return None
         try:
-            prompt = f"""
-Query: {query}
+            db = sqlite3.connect(cache_file)
+            db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)")
+            db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - CACHE_TTL_SECONDS,))
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            print(f"Warning: Could not open response cache: {e}")
+            return None
+    
+    def _cache_get(self, key: str):
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return self._cache[key]
+        if self._cache_db is not None:
+            try:
+                row = self._cache_db.execute(
+                    "SELECT value FROM responses WHERE key = ? AND created_at >= ?",
+                    (key, time.time() - CACHE_TTL_SECONDS)
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row:
+                value = json.loads(row[0])
+                self._remember(key, value)
+                self.cache_hits += 1
+                return value
+        self.cache_misses += 1
+        return None
+    
+    def _remember(self, key: str, value) -> None:
+        """Store a response in the in-memory LRU, evicting the least recently used."""
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > MEMORY_CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    def _cache_put(self, key: str, value) -> None:
+        # Store a copy so callers can modify the analysis they get back, as with hits
+        self._remember(key, dict(value) if isinstance(value, dict) else value)
+        if self._cache_db is not None:
+            try:
+                self._cache_db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time())
+                )
+                self._cache_db.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: Could not write response cache: {e}")
+    
+    def _truncate_query(self, query: str) -> str:
+        """Cap the query text embedded in prompts; machine-generated SQL can run to tens of KB."""
+        if len(query) <= self._MAX_QUERY_CHARS:
+            return query
+        return f"{query[:self._MAX_QUERY_CHARS]}\n-- [truncated {len(query) - self._MAX_QUERY_CHARS} chars] --"
+    
+    def _build_analysis_prompt(self, query: str, metrics: Dict) -> str:
+        prompt = f"""
+Query: {self._truncate_query(query)}
 Execution Time: {metrics.get('execution_time', 0):.2f}s
 Rows Examined: {metrics.get('rows_examined', 0):,}
 Rows Sent: {metrics.get('rows_sent', 0):,}
@@ -58,53 +213,118 @@ Please analyze this query and provide:
 4. Estimated performance improvement
 5. Severity (Critical/High/Medium/Low)
 """
-            response = self.model.generate_content(
-                f"{self.system_prompts['query_analysis']}\n\n{prompt}"
+        return prompt
+    
+    def _analysis_error(self, query: str, metrics: Dict, error: Exception) -> Dict:
+        return {
+            'query': query,
+            'execution_time': metrics.get('execution_time', 0),
+            'rows_examined': metrics.get('rows_examined', 0),
+            'rows_sent': metrics.get('rows_sent', 0),
+            'ai_analysis': f"Error analyzing query: {str(error)}",
+            'severity': 'unknown',
+            'recommendations': ["Unable to analyze due to API error"],
+            'indexes': [],
+            'estimated_improvement': "Unknown"
+        }
+    
+    def analyze_query(self, query: str, metrics: Dict) -> Dict:
+        key = self._cache_key('analyze', query, self._metrics_key(metrics))
+        cached = self._cache_get(key)
+        if cached is not None:
+            return dict(cached)
+        try:
+            response = self.models['query_analysis'].generate_content(
+                self._build_analysis_prompt(query, metrics), generation_config=self._analysis_config
             )
-            return self._parse_analysis_response(response.text, query, metrics)
+            result = self._parse_structured_response(response.text, query, metrics)
+            self._cache_put(key, result)
+            return result
+        except Exception as e:
+            return self._analysis_error(query, metrics, e)
+    
+    async def _generate_async(self, purpose: str, prompt: str, **kwargs):
+        """Call the async Gemini endpoint, backing off on rate limits and server errors."""
+        delay = 1.0
+        for attempt in range(MAX_RETRIES):
+            try:
+                return await self.models[purpose].generate_content_async(prompt, **kwargs)
+            except Exception as e:
+                if attempt == MAX_RETRIES - 1 or getattr(e, 'code', None) not in RETRYABLE_STATUS_CODES:
+                    raise
+                await asyncio.sleep(delay)
+                delay *= 2
+    
+    async def _analyze_query_async(self, query: str, metrics: Dict, semaphore: asyncio.Semaphore) -> Dict:
+        key = self._cache_key('analyze', query, self._metrics_key(metrics))
+        cached = self._cache_get(key)
+        if cached is not None:
+            return dict(cached)
+        try:
+            async with semaphore:
+                response = await self._generate_async(
+                    'query_analysis', self._build_analysis_prompt(query, metrics),
+                    generation_config=self._analysis_config,
+                    request_options=BULK_REQUEST_OPTIONS
+                )
+            result = self._parse_structured_response(response.text, query, metrics)
+            self._cache_put(key, result)
+            return result
         except Exception as e:
-            return {
-                'query': query,
-                'execution_time': metrics.get('execution_time', 0),
-                'rows_examined': metrics.get('rows_examined', 0),
-                'rows_sent': metrics.get('rows_sent', 0),
-                'ai_analysis': f"Error analyzing query: {str(e)}",
-                'severity': 'unknown',
-                'recommendations': ["Unable to analyze due to API error"],
-                'indexes': [],
-                'estimated_improvement': "Unknown"
-            }
+            return self._analysis_error(query, metrics, e)
     
     def ask_question(self, question: str, context: Optional[Dict] = None) -> str:
+        return "".join(self.stream_question(question, context))
+    
+    def stream_question(self, question: str, context: Optional[Dict] = None) -> Iterator[str]:
+        """Yield the answer to ``question`` chunk by chunk as Gemini generates it."""
         try:
             analysis_context = self._get_recent_analysis_context()
             context_str = ""
             if context:
-                context_str = f"\n\nQuery: {context.get('query', 'N/A')}\nExecution Time: {context.get('execution_time', 0):.2f}s\nRows Examined: {context.get('rows_examined', 0):,}"
-            full_context = f"{self.system_prompts['conversational']}\n\n{analysis_context}\n\n{question}{context_str}"
-            return self.model.generate_content(full_context).text
+                context_str = f"\n\nQuery: {self._truncate_query(context.get('query', 'N/A'))}\nExecution Time: {context.get('execution_time', 0):.2f}s\nRows Examined: {context.get('rows_examined', 0):,}"
+            full_context = f"{analysis_context}\n\n{question}{context_str}"
+            key = self._cache_key('ask', question, analysis_context, context_str)
+            cached = self._cache_get(key)
+            if cached is not None:
+                yield cached
+                return
+            chunks = []
+            for chunk in self.models['conversational'].generate_content(full_context, stream=True):
+                chunks.append(chunk.text)
+                yield chunk.text
+            self._cache_put(key, "".join(chunks))
         except Exception as e:
-            return f"Error: {str(e)}"
+            yield f"Error: {str(e)}"
     
     def _get_recent_analysis_context(self) -> str:
         try:
-            if os.path.exists('recent_analysis.json'):
-                with open('recent_analysis.json', 'r') as f:
-                    recent_data = json.load(f)
-                context = f"""CURRENT DATABASE CONTEXT:
+            try:
+                mtime = os.stat(ANALYSIS_CONTEXT_FILE).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if mtime is not None:
+                if self._ctx_cache and self._ctx_cache[0] == mtime:
+                    return self._ctx_cache[1]
+                recent_data = read_json(ANALYSIS_CONTEXT_FILE)
+                parts = [f"""CURRENT DATABASE CONTEXT:
 Total Queries Analyzed: {recent_data.get('total_queries', 0)}
 Slow Queries: {recent_data.get('slow_queries', 0)}
 Critical Issues: {recent_data.get('critical_issues', 0)}
 Average Execution Time: {recent_data.get('avg_execution_time', 0):.2f}s
 
 Recent Slow Queries:
-"""
+"""]
                 for i, query in enumerate(recent_data.get('queries', [])[:5], 1):
-                    context += f"Query #{i}: {query.get('query', 'N/A')[:60]}...\n"
-                    context += f"  Execution Time: {query.get('execution_time', 0):.2f}s\n"
-                    context += f"  Rows Examined: {query.get('rows_examined', 0):,}\n"
-                    context += f"  Severity: {query.get('severity', 'unknown')}\n"
-                    context += f"  Main Issue: {query.get('main_issue', 'N/A')}\n\n"
+                    parts.append(
+                        f"Query #{i}: {query.get('query', 'N/A')[:60]}...\n"
+                        f"  Execution Time: {query.get('execution_time', 0):.2f}s\n"
+                        f"  Rows Examined: {query.get('rows_examined', 0):,}\n"
+                        f"  Severity: {query.get('severity', 'unknown')}\n"
+                        f"  Main Issue: {query.get('main_issue', 'N/A')}\n\n"
+                    )
+                context = "".join(parts)
+                self._ctx_cache = (mtime, context)
                 return context
             return "No recent analysis data available."
         except Exception as e:
@@ -113,7 +333,7 @@ Recent Slow Queries:
     def generate_recommendations(self, query: str, issues: List[str]) -> List[str]:
         try:
             prompt = f"""
-Query: {query}
+Query: {self._truncate_query(query)}
 Issues: {', '.join(issues)}
 
 Provide:
@@ -122,118 +342,239 @@ Provide:
 3. Config optimizations
 4. Monitoring advice
 """
-            response = self.model.generate_content(
-                f"{self.system_prompts['recommendations']}\n\n{prompt}"
-            )
+            response = self.models['recommendations'].generate_content(prompt)
             return self._parse_recommendations(response.text)
         except Exception as e:
             return [f"Error generating recommendations: {str(e)}"]
     
+    def _parse_structured_response(self, response_text: str, query: str, metrics: Dict) -> Dict:
+        """Decode a JSON-mode response, falling back to free-text parsing if it isn't valid JSON."""
+        try:
+            item = loads(response_text)
+        except ValueError:
+            item = None
+        if isinstance(item, dict):
+            return self._result_from_json(item, query, metrics)
+        return self._parse_analysis_response(response_text, query, metrics)
+    
     def _parse_analysis_response(self, analysis_text: str, query: str, metrics: Dict) -> Dict:
-        severity = 'medium'
-        if 'critical' in analysis_text.lower():
-            severity = 'critical'
-        elif 'high' in analysis_text.lower():
-            severity = 'high'
-        elif 'low' in analysis_text.lower():
-            severity = 'low'
+        found = {keyword.lower() for keyword in _SEVERITY_RE.findall(analysis_text)}
+        severity = next((level for level in ('critical', 'high', 'low') if level in found), 'medium')
         
-        indexes = [line.strip() for line in analysis_text.split('\n') if 'CREATE INDEX' in line.upper()]
+        indexes = [line.strip() for line in _INDEX_RE.findall(analysis_text)]
         recommendations = self._parse_recommendations(analysis_text)
-        improvement = next((line.strip() for line in analysis_text.split('\n') if any(word in line.lower() for word in ['improvement', 'faster', 'reduce', 'optimize'])), "Unknown")
+        improvement_match = _IMPROVEMENT_RE.search(analysis_text)
+        improvement = improvement_match.group(0).strip() if improvement_match else "Unknown"
         
         return {
             'query': query,
             'execution_time': metrics.get('execution_time', 0),
             'rows_examined': metrics.get('rows_examined', 0),
             'rows_sent': metrics.get('rows_sent', 0),
-            'efficiency_ratio': metrics.get('rows_sent', 0) / max(metrics.get('rows_examined', 1), 1),
+            'efficiency_ratio': metrics.get('efficiency_ratio', 0.0),
             'ai_analysis': analysis_text,
             'severity': severity,
             'recommendations': recommendations,
             'indexes': indexes,
-            'estimated_improvement': improvement
+            'estimated_improvement': improvement,
+            'main_issue': self._extract_main_issue(analysis_text)
         }
     
     def _parse_recommendations(self, text: str) -> List[str]:
-        recommendations = []
-        for line in text.split('\n'):
-            line = line.strip()
-            if line and (line.startswith(tuple(f"{i}." for i in range(1, 10))) or 
-                         line.startswith(('•', '-', '*')) or
-                         line.upper().startswith(('CREATE', 'ALTER', 'OPTIMIZE'))):
-                recommendations.append(line.lstrip('123456789.•-* ').strip())
-        return recommendations[:10]
-    
-    def analyze_multiple_queries(self, queries: List[Dict]) -> List[Dict]:
-        results = []
-        for query_data in queries:
-            metrics = {
-                'execution_time': query_data.get('execution_time', 0),
-                'rows_examined': query_data.get('rows_examined', 0),
-                'rows_sent': query_data.get('rows_sent', 0),
-                'efficiency_ratio': query_data.get('rows_sent', 0) / max(query_data.get('rows_examined', 1), 1)
-            }
-            results.append(self.analyze_query(query_data['query'], metrics))
+        return [line.lstrip('123456789.•-* ').strip() for line in _RECOMMENDATION_RE.findall(text)[:10]]
+    
+    def analyze_multiple_queries(self, queries: List[Dict], batch_size: int = 0) -> List[Dict]:
+        """Analyze queries concurrently.
+
+        With ``batch_size`` > 0, up to that many queries are packed into a single
+        prompt and answered as one JSON array, trading per-call latency for far
+        fewer requests against the rate limit.
+        """
+        results = asyncio.run(self._gather_analyses(queries, batch_size))
         self._save_analysis_context(results)
         return results
     
+    @staticmethod
+    def _query_metrics(query_data: Dict) -> Dict:
+        return {
+            'execution_time': query_data.get('execution_time', 0),
+            'rows_examined': query_data.get('rows_examined', 0),
+            'rows_sent': query_data.get('rows_sent', 0),
+            'efficiency_ratio': query_data.get('rows_sent', 0) / max(query_data.get('rows_examined', 1), 1)
+        }
+    
+    async def _gather_analyses(self, queries: List[Dict], batch_size: int = 0) -> List[Dict]:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # Identical statements repeat constantly in slow-query logs; analyze each
+        # distinct query once and fan the result back out to every occurrence.
+        occurrences: Dict[str, List[int]] = {}
+        for i, query_data in enumerate(queries):
+            occurrences.setdefault(query_data['query'], []).append(i)
+        items = [(query, self._query_metrics(queries[positions[0]])) for query, positions in occurrences.items()]
+        
+        if batch_size > 0:
+            batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+            nested = await asyncio.gather(*[self._analyze_batch(batch, semaphore) for batch in batches])
+            unique_results = [result for batch_results in nested for result in batch_results]
+        else:
+            unique_results = await asyncio.gather(*[self._analyze_query_async(query, metrics, semaphore) for query, metrics in items])
+        
+        results: List[Optional[Dict]] = [None] * len(queries)
+        for positions, result in zip(occurrences.values(), unique_results):
+            results[positions[0]] = result
+            for i in positions[1:]:
+                duplicate = dict(result)
+                duplicate.update(self._query_metrics(queries[i]))
+                results[i] = duplicate
+        return results
+    
+    def _build_batch_prompt(self, batch: List[Tuple[str, Dict]]) -> str:
+        parts = [
+            "Analyze each of the following MySQL queries. Return a JSON array with one object per query, "
+            "in the same order, using keys: severity (critical/high/medium/low), ai_analysis, indexes "
+            "(list of CREATE INDEX statements), recommendations (list of strings), estimated_improvement.\n"
+        ]
+        for i, (query, metrics) in enumerate(batch, 1):
+            parts.append(
+                f"\n[Q{i}] {self._truncate_query(query)}\n"
+                f"Execution Time: {metrics.get('execution_time', 0):.2f}s\n"
+                f"Rows Examined: {metrics.get('rows_examined', 0):,}\n"
+                f"Rows Sent: {metrics.get('rows_sent', 0):,}\n"
+                f"Efficiency: {metrics.get('efficiency_ratio', 0):.2%}\n"
+            )
+        return "".join(parts)
+    
+    async def _analyze_batch(self, batch: List[Tuple[str, Dict]], semaphore: asyncio.Semaphore) -> List[Dict]:
+        """Analyze a batch in one request, halving the batch whenever the reply can't be parsed."""
+        keys = [self._cache_key('analyze', query, self._metrics_key(metrics)) for query, metrics in batch]
+        results: List[Optional[Dict]] = [None] * len(batch)
+        pending = []
+        for i, key in enumerate(keys):
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[i] = dict(cached)
+            else:
+                pending.append(i)
+        if not pending:
+            return results
+        if len(pending) == 1:
+            query, metrics = batch[pending[0]]
+            results[pending[0]] = await self._analyze_query_async(query, metrics, semaphore)
+            return results
+        
+        todo = [batch[i] for i in pending]
+        items = None
+        try:
+            async with semaphore:
+                response = await self._generate_async(
+                    'query_analysis',
+                    self._build_batch_prompt(todo),
+                    generation_config=self._batch_analysis_config,
+                    request_options=BULK_REQUEST_OPTIONS
+                )
+            items = loads(response.text)
+        except Exception:
+            pass
+        
+        if not isinstance(items, list) or len(items) != len(todo) or not all(isinstance(item, dict) for item in items):
+            half = len(todo) // 2
+            split = await asyncio.gather(self._analyze_batch(todo[:half], semaphore),
+                                         self._analyze_batch(todo[half:], semaphore))
+            for i, result in zip(pending, split[0] + split[1]):
+                results[i] = result
+            return results
+        
+        for i, (query, metrics), item in zip(pending, todo, items):
+            result = self._result_from_json(item, query, metrics)
+            self._cache_put(keys[i], result)
+            results[i] = result
+        return results
+    
+    def _result_from_json(self, item: Dict, query: str, metrics: Dict) -> Dict:
+        severity = str(item.get('severity', 'medium')).lower()
+        if severity not in ('critical', 'high', 'medium', 'low'):
+            severity = 'medium'
+        ai_analysis = str(item.get('ai_analysis', ''))
+        return {
+            'query': query,
+            'execution_time': metrics.get('execution_time', 0),
+            'rows_examined': metrics.get('rows_examined', 0),
+            'rows_sent': metrics.get('rows_sent', 0),
+            'efficiency_ratio': metrics.get('efficiency_ratio', 0.0),
+            'ai_analysis': ai_analysis,
+            'severity': severity,
+            'recommendations': [str(r) for r in item.get('recommendations') or []][:10],
+            'indexes': [str(idx) for idx in item.get('indexes') or []],
+            'estimated_improvement': str(item.get('estimated_improvement') or 'Unknown'),
+            'main_issue': self._extract_main_issue(ai_analysis)
+        }
+    
+    @staticmethod
+    def _extract_main_issue(analysis_text: str) -> str:
+        match = _MAIN_ISSUE_RE.search(analysis_text)
+        return match.group(0).strip() if match else "Unknown"
+    
     def _save_analysis_context(self, analyses: List[Dict]) -> None:
         try:
-            total_queries = len(analyses)
-            slow_queries = sum(1 for a in analyses if a.get('execution_time', 0) > 2.0)
-            critical_issues = sum(1 for a in analyses if a.get('severity') == 'critical')
-            avg_execution_time = sum(a.get('execution_time', 0) for a in analyses) / len(analyses)
+            counters = Counter()
+            total_execution_time = 0.0
             queries_data = []
             for analysis in analyses:
-                main_issue = "Unknown"
-                if 'ai_analysis' in analysis:
-                    for line in analysis['ai_analysis'].split('\n'):
-                        if 'Why' in line:
-                            main_issue = line.strip()
-                            break
+                execution_time = analysis.get('execution_time', 0)
+                total_execution_time += execution_time
+                if execution_time > 2.0:
+                    counters['slow'] += 1
+                counters[analysis.get('severity')] += 1
                 queries_data.append({
                     'query': analysis.get('query', ''),
-                    'execution_time': analysis.get('execution_time', 0),
+                    'execution_time': execution_time,
                     'rows_examined': analysis.get('rows_examined', 0),
                     'severity': analysis.get('severity', 'unknown'),
-                    'main_issue': main_issue
+                    'main_issue': analysis.get('main_issue', 'Unknown')
                 })
-            with open('recent_analysis.json', 'w') as f:
-                json.dump({
-                    'total_queries': total_queries,
-                    'slow_queries': slow_queries,
-                    'critical_issues': critical_issues,
-                    'avg_execution_time': avg_execution_time,
-                    'queries': queries_data,
-                    'timestamp': __import__('time').time()
-                }, f, indent=2)
+            write_json(ANALYSIS_CONTEXT_FILE, {
+                'total_queries': len(analyses),
+                'slow_queries': counters['slow'],
+                'critical_issues': counters['critical'],
+                'avg_execution_time': total_execution_time / len(analyses),
+                'queries': queries_data,
+                'timestamp': time.time()
+            })
+            self._ctx_cache = None
         except Exception as e:
             print(f"Warning: Could not save analysis context: {e}")
     
     def generate_summary_report(self, analyses: List[Dict]) -> str:
+        return "".join(self.stream_summary_report(analyses))
+    
+    def stream_summary_report(self, analyses: List[Dict]) -> Iterator[str]:
+        """Yield the summary report chunk by chunk as Gemini generates it."""
         try:
-            total_queries = len(analyses)
-            slow_queries = sum(1 for a in analyses if a.get('execution_time', 0) > 2.0)
-            critical_issues = sum(1 for a in analyses if a.get('severity') == 'critical')
-            high_issues = sum(1 for a in analyses if a.get('severity') == 'high')
-            all_indexes = list({idx for a in analyses for idx in a.get('indexes', [])})
+            counters = Counter()
+            index_set: Dict[str, None] = {}
+            for a in analyses:
+                if a.get('execution_time', 0) > 2.0:
+                    counters['slow'] += 1
+                counters[a.get('severity')] += 1
+                index_set.update(dict.fromkeys(a.get('indexes') or ()))
+            all_indexes = list(index_set)
             prompt = f"""
 Generate a professional MySQL performance report:
 
-Total Queries: {total_queries}
-Slow Queries (>2s): {slow_queries}
-Critical Issues: {critical_issues}
-High Priority Issues: {high_issues}
+Total Queries: {len(analyses)}
+Slow Queries (>2s): {counters['slow']}
+Critical Issues: {counters['critical']}
+High Priority Issues: {counters['high']}
 
 Top Issues:
-{chr(10).join([f"- {a.get('query', '')[:50]}... ({a.get('severity', 'unknown')})" for a in analyses[:5]])}
+{chr(10).join(f"- {a.get('query', '')[:50]}... ({a.get('severity', 'unknown')})" for a in analyses[:5])}
 
 Recommended Indexes:
 {chr(10).join(all_indexes[:10])}
 """
-            return self.model.generate_content(
-                f"You are a senior database consultant. Generate a professional performance report.\n\n{prompt}"
-            ).text
+            for chunk in self.models['summary_report'].generate_content(
+                prompt, stream=True, request_options=BULK_REQUEST_OPTIONS
+            ):
+                yield chunk.text
         except Exception as e:
-            return f"Error generating summary report: {str(e)}"
+            yield f"Error generating summary report: {str(e)}"
@@ -17,18 +17,45 @@ import argparse
 import json
 import os
 import sys
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import joblib
 import mysql.connector
+import mysql.connector.pooling
 import numpy as np
-import pandas as pd
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 
+from config_io import dumps_line, loads, read_json
 from query_analyzer import QueryAnalyzer
 from gemini_analyzer import GeminiAnalyzer
 
+METRICS_HISTORY_FILE = 'metrics_history.jsonl'
+# Pre-JSON Lines history (one JSON array); converted once if the .jsonl file is missing
+LEGACY_METRICS_HISTORY_FILE = 'metrics_history.json'
+MAX_HISTORY_ENTRIES = 1000
+# The history file is append-only; once it holds this many lines beyond
+# MAX_HISTORY_ENTRIES it is rewritten down to the most recent entries.
+HISTORY_TRIM_INTERVAL = 500
+MODEL_CACHE_FILE = 'anomaly_model.joblib'
+# Retrain once more than this fraction of the history is newer than the cached model.
+MODEL_RETRAIN_FRACTION = 0.1
+SEVERITY_RANK = {'critical': 3, 'high': 2, 'medium': 1, 'low': 0}
+SEVERITY_ICONS = {
+    'critical': '🔴',
+    'high': '🟠',
+    'medium': '🟡',
+    'low': '🟢'
+}
+METRIC_THRESHOLDS = {
+    'Threads_connected': 100,
+    'Threads_running': 50,
+    'Slow_queries': 10,
+    'Questions': 1000000
+}
+
 
 class MySQLObservabilityTool:
     """Main class for MySQL observability operations."""
@@ -39,8 +66,17 @@ class MySQLObservabilityTool:
         self.model = None
         self.scaler = StandardScaler()
         self.metrics_history = []
+        self._history_file_lines = None
+        # Set when the history file ends mid-line, e.g. after an interrupted append
+        self._history_partial_line = False
+        self._warned_bad_history = False
         self.query_analyzer = QueryAnalyzer()
         self.gemini_analyzer = None
+        self._pool = None
+        self._demo_cache: Dict[int, Sequence[Dict]] = {}
+        placeholders = ", ".join(["%s"] * len(self.config["metrics"]["enabled"]))
+        self.feature_columns = list(self.config["metrics"]["enabled"])
+        self._status_query = f"SHOW GLOBAL STATUS WHERE Variable_name IN ({placeholders})"
         
     def _load_config(self, config_file: str) -> Dict:
         """Load configuration from file or create default."""
@@ -85,17 +121,24 @@ class MySQLObservabilityTool:
             print(f"Created default configuration file: {config_file}")
             return default_config
     
-    def connect_to_mysql(self) -> Optional[mysql.connector.connection.MySQLConnection]:
-        """Establish connection to MySQL database."""
+    def connect_to_mysql(self) -> Optional[mysql.connector.pooling.PooledMySQLConnection]:
+        """Check out a connection from the MySQL pool, creating the pool on first use.
+
+        Closing the returned connection hands it back to the pool rather than
+        tearing down the socket, so repeated samples skip the connect handshake.
+        """
         try:
-            connection = mysql.connector.connect(
-                host=self.config["mysql"]["host"],
-                port=self.config["mysql"]["port"],
-                user=self.config["mysql"]["user"],
-                password=self.config["mysql"]["password"],
-                database=self.config["mysql"]["database"]
-            )
-            return connection
+            if self._pool is None:
+                self._pool = mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name="observability",
+                    pool_size=5,
+                    host=self.config["mysql"]["host"],
+                    port=self.config["mysql"]["port"],
+                    user=self.config["mysql"]["user"],
+                    password=self.config["mysql"]["password"],
+                    database=self.config["mysql"]["database"]
+                )
+            return self._pool.get_connection()
         except mysql.connector.Error as e:
             print(f"Error connecting to MySQL: {e}")
             return None
@@ -109,32 +152,69 @@ class MySQLObservabilityTool:
         if not connection:
             return {}
         
+        cursor = connection.cursor(buffered=True)
+        
+        try:
+            metrics = self._read_status(cursor)
+        except Exception as e:
+            print(f"Error collecting metrics: {e}")
+            metrics = {}
+        finally:
+            cursor.close()
+            connection.close()
+        
+        return metrics
+    
+    def collect_metrics_batch(self, samples: int) -> Tuple[int, Dict[str, float]]:
+        """Collect and save several samples over one connection and cursor.
+
+        Returns how many samples were saved and the last of them; (0, {}) if
+        MySQL is unavailable. A failure partway through keeps what was saved.
+        """
+        connection = self.connect_to_mysql()
+        if not connection:
+            return 0, {}
+        
+        saved = 0
         metrics = {}
-        cursor = connection.cursor()
+        cursor = connection.cursor(buffered=True)
         
         try:
-            for metric_name in self.config["metrics"]["enabled"]:
-                try:
-                    cursor.execute(f"SHOW GLOBAL STATUS LIKE '{metric_name}';")
-                    result = cursor.fetchone()
-                    if result:
-                        metrics[metric_name] = float(result[1]) if result[1].isdigit() else 0.0
-                    else:
-                        metrics[metric_name] = 0.0
-                except Exception as e:
-                    print(f"Warning: Could not collect metric {metric_name}: {e}")
-                    metrics[metric_name] = 0.0
-            
-            metrics['timestamp'] = datetime.now().timestamp()
-            
+            for _ in range(samples):
+                sample = self._read_status(cursor)
+                self.save_metrics(sample)
+                saved += 1
+                metrics = sample
         except Exception as e:
             print(f"Error collecting metrics: {e}")
         finally:
             cursor.close()
             connection.close()
         
+        return saved, metrics
+    
+    def _read_status(self, cursor) -> Dict[str, float]:
+        """Run the status query on an open cursor and parse one metrics sample."""
+        cursor.execute(self._status_query, tuple(self.config["metrics"]["enabled"]))
+        status = dict(cursor.fetchall())
+        
+        metrics = {}
+        for metric_name in self.config["metrics"]["enabled"]:
+            # Names the server does not report as status (e.g. Innodb_buffer_pool_size,
+            # a system variable) record 0.0, as before
+            metrics[metric_name] = self._safe_float(status.get(metric_name))
+        
+        metrics['timestamp'] = datetime.now().timestamp()
         return metrics
     
+    @staticmethod
+    def _safe_float(value) -> float:
+        """Parse a status value, treating missing or non-numeric values (e.g. 'ON') as 0.0."""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+    
     def _generate_demo_metrics(self) -> Dict[str, float]:
         """Generate demo metrics for testing when MySQL is not available."""
         import random
@@ -165,33 +245,43 @@ class MySQLObservabilityTool:
             print("No metrics collected.")
             return
         
-        print("\n" + "="*60)
-        print("MySQL Performance Metrics")
-        print("="*60)
-        print(f"{'Metric':<30} {'Value':<20} {'Status':<10}")
-        print("-"*60)
-        
-        thresholds = {
-            'Threads_connected': 100,
-            'Threads_running': 50,
-            'Slow_queries': 10,
-            'Questions': 1000000
-        }
+        lines = [
+            "\n" + "="*60,
+            "MySQL Performance Metrics",
+            "="*60,
+            f"{'Metric':<30} {'Value':<20} {'Status':<10}",
+            "-"*60
+        ]
         
         for metric, value in metrics.items():
             if metric == 'timestamp':
                 continue
                 
             status = "OK"
-            if metric in thresholds:
-                if value > thresholds[metric]:
+            if metric in METRIC_THRESHOLDS:
+                if value > METRIC_THRESHOLDS[metric]:
                     status = "HIGH"
                 elif value < 0:
                     status = "ERROR"
             
-            print(f"{metric:<30} {value:<20.2f} {status:<10}")
+            lines.append(f"{metric:<30} {value:<20.2f} {status:<10}")
         
-        print("="*60)
+        lines.append("="*60)
+        print("\n".join(lines))
+    
+    def _feature_matrix(self, rows: List[Dict[str, float]]) -> np.ndarray:
+        """Pack metric samples into a (samples x features) array in a fixed column order.
+
+        Raw counters such as Questions and Uptime are large and monotonically
+        increasing, so the matrix stays float64 until it has been scaled;
+        float32's 24-bit mantissa would merge neighbouring samples.
+        """
+        columns = self.feature_columns
+        return np.fromiter(
+            (row.get(col, 0.0) for row in rows for col in columns),
+            dtype=np.float64,
+            count=len(rows) * len(columns)
+        ).reshape(len(rows), len(columns))
     
     def train_anomaly_model(self, metrics_data: List[Dict[str, float]]) -> None:
         """Train the anomaly detection model."""
@@ -199,19 +289,55 @@ class MySQLObservabilityTool:
             print(f"Not enough data for training. Need at least {self.config['ml']['min_samples_for_training']} samples.")
             return
         
-        df = pd.DataFrame(metrics_data)
-        numeric_columns = [col for col in df.columns if col != 'timestamp']
-        X = df[numeric_columns].values
-        
-        X_scaled = self.scaler.fit_transform(X)
+        cached = self._load_cached_model()
+        if cached is not None:
+            new_rows = [row for row in metrics_data if row.get('timestamp', 0.0) > cached['last_timestamp']]
+            if len(new_rows) <= len(metrics_data) * MODEL_RETRAIN_FRACTION:
+                self.scaler = cached['scaler']
+                self.model = cached['model']
+                print(f"Reusing cached anomaly detection model ({MODEL_CACHE_FILE}).")
+                return
+            # Only the forest needs a full refit; fold just the unseen samples
+            # into the cached scaler's running mean and variance.
+            self.scaler = cached['scaler']
+            self.scaler.partial_fit(self._feature_matrix(new_rows))
+            X_scaled = self.scaler.transform(self._feature_matrix(metrics_data))
+        else:
+            X_scaled = self.scaler.fit_transform(self._feature_matrix(metrics_data))
+        # Scaled features are small, so float32 (what the forest's trees use) is safe now
+        X_scaled = X_scaled.astype(np.float32)
         
         self.model = IsolationForest(
             contamination=self.config["ml"]["contamination"],
-            random_state=self.config["ml"]["random_state"]
+            random_state=self.config["ml"]["random_state"],
+            n_jobs=-1
         )
         self.model.fit(X_scaled)
         
         print(f"Anomaly detection model trained on {len(metrics_data)} samples.")
+        
+        try:
+            joblib.dump({
+                'scaler': self.scaler,
+                'model': self.model,
+                'columns': self.feature_columns,
+                'ml': self.config["ml"],
+                'last_timestamp': max(row.get('timestamp', 0.0) for row in metrics_data)
+            }, MODEL_CACHE_FILE, compress=3)
+        except Exception as e:
+            print(f"Warning: Could not cache anomaly model: {e}")
+    
+    def _load_cached_model(self) -> Optional[Dict]:
+        """Load the cached scaler and model if they were built for the current columns and ml settings."""
+        if not os.path.exists(MODEL_CACHE_FILE):
+            return None
+        try:
+            cached = joblib.load(MODEL_CACHE_FILE)
+        except Exception:
+            return None
+        if cached.get('columns') != self.feature_columns or cached.get('ml') != self.config["ml"]:
+            return None
+        return cached
     
     def detect_anomalies(self, current_metrics: Dict[str, float]) -> Tuple[bool, float]:
         """Detect anomalies in current metrics."""
@@ -219,33 +345,98 @@ class MySQLObservabilityTool:
             print("Model not trained yet. Collecting more data...")
             return False, 0.0
         
-        numeric_columns = [col for col in current_metrics.keys() if col != 'timestamp']
-        current_values = [current_metrics[col] for col in numeric_columns]
-        X_current = np.array(current_values).reshape(1, -1)
+        X_current = self._feature_matrix([current_metrics])
         
-        X_current_scaled = self.scaler.transform(X_current)
+        X_current_scaled = self.scaler.transform(X_current).astype(np.float32)
         
-        prediction = self.model.predict(X_current_scaled)[0]
         anomaly_score = self.model.decision_function(X_current_scaled)[0]
         
-        is_anomaly = prediction == -1
+        # decision_function is already shifted by the contamination-based offset_,
+        # so negative scores are exactly the samples predict() would label -1.
+        is_anomaly = anomaly_score < 0
         return is_anomaly, anomaly_score
     
     def save_metrics(self, metrics: Dict[str, float]) -> None:
-        """Save metrics to history file."""
+        """Append one sample to the history file."""
         self.metrics_history.append(metrics)
         
-        if len(self.metrics_history) > 1000:
-            self.metrics_history = self.metrics_history[-1000:]
-        
-        with open('metrics_history.json', 'w') as f:
-            json.dump(self.metrics_history, f, indent=2)
+        if len(self.metrics_history) > MAX_HISTORY_ENTRIES:
+            del self.metrics_history[:-MAX_HISTORY_ENTRIES]
+        
+        if self._history_file_lines is None:
+            self._history_file_lines = self._count_history_lines()
+        with open(METRICS_HISTORY_FILE, 'a') as f:
+            if self._history_partial_line:
+                # Keep the new sample off the cut-short line; loading skips that line
+                f.write("\n")
+                self._history_partial_line = False
+            f.write(dumps_line(metrics))
+        self._history_file_lines += 1
+        
+        if self._history_file_lines >= MAX_HISTORY_ENTRIES + HISTORY_TRIM_INTERVAL:
+            self._trim_history_file()
+    
+    def _count_history_lines(self) -> int:
+        self._migrate_legacy_history()
+        if not os.path.exists(METRICS_HISTORY_FILE):
+            return 0
+        count = 0
+        line = "\n"
+        with open(METRICS_HISTORY_FILE, 'r') as f:
+            for count, line in enumerate(f, 1):
+                pass
+        self._history_partial_line = not line.endswith("\n")
+        return count
+    
+    def _parse_history_line(self, line: str) -> Optional[Dict[str, float]]:
+        """Parse one history line, returning None (and warning once) if it is damaged."""
+        try:
+            return loads(line)
+        except ValueError:
+            if not self._warned_bad_history:
+                self._warned_bad_history = True
+                print(f"Warning: Skipping unreadable lines in {METRICS_HISTORY_FILE}")
+            return None
+    
+    def _trim_history_file(self) -> None:
+        """Rewrite the history file keeping only the most recent readable entries."""
+        with open(METRICS_HISTORY_FILE, 'r') as f:
+            lines = deque(
+                (line if line.endswith("\n") else line + "\n"
+                 for line in f if line.strip() and self._parse_history_line(line) is not None),
+                maxlen=MAX_HISTORY_ENTRIES
+            )
+        tmp_file = METRICS_HISTORY_FILE + '.tmp'
+        with open(tmp_file, 'w') as f:
+            f.writelines(lines)
+        os.replace(tmp_file, METRICS_HISTORY_FILE)
+        self._history_file_lines = len(lines)
+        self._history_partial_line = False
+    
+    def _migrate_legacy_history(self) -> None:
+        """Convert metrics_history.json to the JSON Lines file if that does not exist yet."""
+        if os.path.exists(METRICS_HISTORY_FILE) or not os.path.exists(LEGACY_METRICS_HISTORY_FILE):
+            return
+        try:
+            entries = read_json(LEGACY_METRICS_HISTORY_FILE)[-MAX_HISTORY_ENTRIES:]
+        except Exception as e:
+            print(f"Warning: Could not read {LEGACY_METRICS_HISTORY_FILE}: {e}")
+            return
+        tmp_file = METRICS_HISTORY_FILE + '.tmp'
+        with open(tmp_file, 'w') as f:
+            f.writelines(dumps_line(entry) for entry in entries)
+        os.replace(tmp_file, METRICS_HISTORY_FILE)
     
     def load_metrics_history(self) -> List[Dict[str, float]]:
-        """Load metrics history from file."""
-        if os.path.exists('metrics_history.json'):
-            with open('metrics_history.json', 'r') as f:
-                return json.load(f)
+        """Load the most recent metrics history entries from file."""
+        self._migrate_legacy_history()
+        if os.path.exists(METRICS_HISTORY_FILE):
+            with open(METRICS_HISTORY_FILE, 'r') as f:
+                lines = deque(enumerate(f, 1), maxlen=MAX_HISTORY_ENTRIES)
+            self._history_file_lines = lines[-1][0] if lines else 0
+            self._history_partial_line = bool(lines) and not lines[-1][1].endswith("\n")
+            entries = (self._parse_history_line(line) for _, line in lines if line.strip())
+            return [entry for entry in entries if entry is not None]
         return []
     
     def show_config(self) -> None:
@@ -281,13 +472,19 @@ class MySQLObservabilityTool:
         
         return self.gemini_analyzer
     
+    def _demo_queries(self, count: int) -> Sequence[Dict]:
+        """Return the demo query sample of the given size, drawing it only once per size."""
+        if count not in self._demo_cache:
+            self._demo_cache[count] = self.query_analyzer.get_demo_queries(count)
+        return self._demo_cache[count]
+    
     def analyze_queries(self) -> None:
         """Analyze slow queries and provide detailed recommendations."""
         print("\n" + "="*80)
         print("DETAILED QUERY ANALYSIS & RECOMMENDATIONS")
         print("="*80)
         
-        demo_queries = self.query_analyzer.get_demo_queries(8)
+        demo_queries = self._demo_queries(8)
         
         print(f"Analyzing {len(demo_queries)} queries...\n")
         
@@ -302,14 +499,19 @@ class MySQLObservabilityTool:
             print("Run: python setup_gemini.py")
             return
         
+        stats = np.array(
+            [(a.get('execution_time', 0), a.get('rows_examined', 0), a.get('rows_sent', 0), a.get('severity'))
+             for a in analyses],
+            dtype=[('execution_time', 'f8'), ('rows_examined', 'i8'), ('rows_sent', 'i8'), ('severity', 'U16')]
+        )
         summary = {
             'total_queries': len(analyses),
-            'slow_queries': sum(1 for a in analyses if a.get('execution_time', 0) > 2.0),
-            'critical_queries': sum(1 for a in analyses if a.get('severity') == 'critical'),
-            'high_priority_queries': sum(1 for a in analyses if a.get('severity') == 'high'),
-            'avg_execution_time': sum(a.get('execution_time', 0) for a in analyses) / len(analyses),
-            'total_rows_examined': sum(a.get('rows_examined', 0) for a in analyses),
-            'total_rows_sent': sum(a.get('rows_sent', 0) for a in analyses),
+            'slow_queries': int((stats['execution_time'] > 2.0).sum()),
+            'critical_queries': int((stats['severity'] == 'critical').sum()),
+            'high_priority_queries': int((stats['severity'] == 'high').sum()),
+            'avg_execution_time': float(stats['execution_time'].mean()),
+            'total_rows_examined': int(stats['rows_examined'].sum()),
+            'total_rows_sent': int(stats['rows_sent'].sum()),
             'issue_counts': {}
         }
         summary['slow_query_percentage'] = (summary['slow_queries'] / summary['total_queries']) * 100
@@ -318,54 +520,55 @@ class MySQLObservabilityTool:
     
     def _display_gemini_analyses(self, analyses: List[Dict]) -> None:
         """Display Gemini-powered query analyses."""
+        lines = []
         for i, analysis in enumerate(analyses, 1):
-            severity_icon = {
-                'critical': '🔴',
-                'high': '🟠', 
-                'medium': '🟡',
-                'low': '🟢'
-            }.get(analysis['severity'], '⚪')
+            severity_icon = SEVERITY_ICONS.get(analysis['severity'], '⚪')
             
-            print(f"{severity_icon} QUERY #{i} ({analysis['severity'].upper()})")
-            print(f"   Execution Time: {analysis['execution_time']:.2f}s")
-            print(f"   Rows Examined: {analysis['rows_examined']:,}")
-            print(f"   Rows Sent: {analysis['rows_sent']:,}")
-            print(f"   Efficiency: {analysis.get('efficiency_ratio', 0):.2%}")
-            print(f"   Query: {analysis['query'][:80]}{'...' if len(analysis['query']) > 80 else ''}")
+            lines.append(f"{severity_icon} QUERY #{i} ({analysis['severity'].upper()})")
+            lines.append(f"   Execution Time: {analysis['execution_time']:.2f}s")
+            lines.append(f"   Rows Examined: {analysis['rows_examined']:,}")
+            lines.append(f"   Rows Sent: {analysis['rows_sent']:,}")
+            lines.append(f"   Efficiency: {analysis.get('efficiency_ratio', 0):.2%}")
+            lines.append(f"   Query: {analysis['query'][:80]}{'...' if len(analysis['query']) > 80 else ''}")
             
-            print(f"\n   🤖 Gemini AI Analysis:")
-            print(f"   {analysis['ai_analysis']}")
+            lines.append(f"\n   🤖 Gemini AI Analysis:")
+            lines.append(f"   {analysis['ai_analysis']}")
             
             if analysis.get('indexes'):
-                print(f"\n   📊 Recommended Indexes:")
+                lines.append(f"\n   📊 Recommended Indexes:")
                 for idx in analysis['indexes'][:3]:
-                    print(f"     • {idx}")
+                    lines.append(f"     • {idx}")
             
             if analysis.get('estimated_improvement'):
-                print(f"\n   📈 Expected Improvement: {analysis['estimated_improvement']}")
+                lines.append(f"\n   📈 Expected Improvement: {analysis['estimated_improvement']}")
             
-            print("-" * 80)
+            lines.append("-" * 80)
+        if lines:
+            print("\n".join(lines))
     
     
     def _display_query_summary(self, summary: Dict) -> None:
         """Display query analysis summary."""
-        print("\n" + "="*60)
-        print("QUERY PERFORMANCE SUMMARY")
-        print("="*60)
-        print(f"Total Queries Analyzed: {summary['total_queries']}")
-        print(f"Slow Queries: {summary['slow_queries']} ({summary['slow_query_percentage']:.1f}%)")
-        print(f"Critical Issues: {summary['critical_queries']}")
-        print(f"High Priority Issues: {summary['high_priority_queries']}")
-        print(f"Average Execution Time: {summary['avg_execution_time']:.2f}s")
-        print(f"Total Rows Examined: {summary['total_rows_examined']:,}")
-        print(f"Total Rows Sent: {summary['total_rows_sent']:,}")
+        lines = [
+            "\n" + "="*60,
+            "QUERY PERFORMANCE SUMMARY",
+            "="*60,
+            f"Total Queries Analyzed: {summary['total_queries']}",
+            f"Slow Queries: {summary['slow_queries']} ({summary['slow_query_percentage']:.1f}%)",
+            f"Critical Issues: {summary['critical_queries']}",
+            f"High Priority Issues: {summary['high_priority_queries']}",
+            f"Average Execution Time: {summary['avg_execution_time']:.2f}s",
+            f"Total Rows Examined: {summary['total_rows_examined']:,}",
+            f"Total Rows Sent: {summary['total_rows_sent']:,}"
+        ]
         
         if summary['issue_counts']:
-            print("\nIssue Breakdown:")
+            lines.append("\nIssue Breakdown:")
             for issue, count in summary['issue_counts'].items():
-                print(f"  • {issue.replace('_', ' ').title()}: {count}")
+                lines.append(f"  • {issue.replace('_', ' ').title()}: {count}")
         
-        print("="*60)
+        lines.append("="*60)
+        print("\n".join(lines))
     
     def generate_query_report(self) -> None:
         """Generate a comprehensive query performance report."""
@@ -373,28 +576,32 @@ class MySQLObservabilityTool:
         print("COMPREHENSIVE QUERY PERFORMANCE REPORT")
         print("="*80)
         
-        all_queries = self.query_analyzer.get_demo_queries(10)
-        analyses = [self.query_analyzer.analyze_query_performance(q) for q in all_queries]
+        all_queries = self._demo_queries(10)
+        analyses = self.query_analyzer.analyze_batch(all_queries)
+        
+        analyses.sort(key=lambda x: (SEVERITY_RANK.get(x.severity, 0), x.execution_time), reverse=True)
         
-        analyses.sort(key=lambda x: (x['severity'] == 'critical', x['execution_time']), reverse=True)
+        by_severity = {'critical': [], 'high': [], 'medium': [], 'low': []}
+        for analysis in analyses:
+            by_severity.setdefault(analysis.severity, []).append(analysis)
         
         print("🚨 CRITICAL ISSUES (Immediate Action Required):")
-        critical_queries = [a for a in analyses if a['severity'] == 'critical']
+        critical_queries = by_severity['critical']
         if critical_queries:
             for analysis in critical_queries:
-                print(f"\n  Query #{analysis['query_id']}: {analysis['execution_time']:.2f}s")
-                print(f"  {analysis['query']}")
-                print(f"  Issue: {analysis['explanation']}")
+                print(f"\n  Query #{analysis.query_id}: {analysis.execution_time:.2f}s")
+                print(f"  {analysis.query}")
+                print(f"  Issue: {analysis.explanation}")
         else:
             print("  ✅ No critical issues found")
         
         print("\n⚠️  HIGH PRIORITY ISSUES:")
-        high_queries = [a for a in analyses if a['severity'] == 'high']
+        high_queries = by_severity['high']
         if high_queries:
             for analysis in high_queries:
-                print(f"\n  Query #{analysis['query_id']}: {analysis['execution_time']:.2f}s")
-                print(f"  {analysis['query']}")
-                print(f"  Issue: {analysis['explanation']}")
+                print(f"\n  Query #{analysis.query_id}: {analysis.execution_time:.2f}s")
+                print(f"  {analysis.query}")
+                print(f"  Issue: {analysis.explanation}")
         else:
             print("  ✅ No high priority issues found")
         
@@ -422,8 +629,10 @@ class MySQLObservabilityTool:
         
         if gemini_analyzer:
             try:
-                answer = gemini_analyzer.ask_question(question)
-                print(f"Answer: {answer}")
+                print("Answer: ", end="", flush=True)
+                for chunk in gemini_analyzer.stream_question(question):
+                    print(chunk, end="", flush=True)
+                print()
             except Exception as e:
                 print(f"❌ Error getting Gemini response: {e}")
                 print("Please check your API key and try again.")
@@ -440,7 +649,7 @@ class MySQLObservabilityTool:
         
         gemini_analyzer = self._get_gemini_analyzer()
         
-        demo_queries = self.query_analyzer.get_demo_queries(5)
+        demo_queries = self._demo_queries(5)
         print(f"Analyzing {len(demo_queries)} queries with Gemini Pro...\n")
         
         if gemini_analyzer:
@@ -451,8 +660,9 @@ class MySQLObservabilityTool:
                 print("\n" + "="*80)
                 print("🤖 GEMINI AI SUMMARY REPORT")
                 print("="*80)
-                summary = gemini_analyzer.generate_summary_report(analyses)
-                print(summary)
+                for chunk in gemini_analyzer.stream_summary_report(analyses):
+                    print(chunk, end="", flush=True)
+                print()
                 
             except Exception as e:
                 print(f"❌ Error during Gemini analysis: {e}")
@@ -513,7 +723,7 @@ Examples:
         return
     
     if args.show_history:
-        history = tool.load_metrics_history()
+        history = tool.metrics_history
         print(f"\nMetrics History ({len(history)} entries):")
         print("="*60)
         for i, entry in enumerate(history[-10:]):
@@ -563,15 +773,20 @@ Examples:
     
     if args.monitor:
         print("Collecting 100 MySQL metrics samples...")
-        for i in range(100):
-                 current_metrics = tool.collect_metrics()
-                 if not current_metrics:
-                   print("MySQL connection failed. Switching to demo mode...")
-                   current_metrics = tool.collect_metrics(demo_mode=True)
-                 if not current_metrics:
+        saved, batch_metrics = tool.collect_metrics_batch(100)
+        if saved:
+            # Never mix demo samples into a history that already has real ones
+            if saved < 100:
+                print(f"Collected {saved} of 100 samples before the connection failed.")
+            current_metrics = batch_metrics
+        else:
+            print("MySQL connection failed. Switching to demo mode...")
+            for i in range(100):
+                current_metrics = tool.collect_metrics(demo_mode=True)
+                if not current_metrics:
                     print("Failed to collect metrics even in demo mode.")
                     sys.exit(1)
-                 tool.save_metrics(current_metrics)
+                tool.save_metrics(current_metrics)
 
         # Show only the last collected datapoint
         tool.display_metrics(current_metrics)
@@ -9,214 +9,309 @@ This module provides detailed analysis of individual queries, including:
 - Performance bottleneck identification
 """
 
-import json
-import random
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
 import re
+from collections import Counter
+
+@dataclass
+class QueryAnalysis:
+    """Result of analyzing a single query."""
+    # Declared by hand rather than with dataclass(slots=True) to stay importable on Python 3.7+
+    __slots__ = ('query_id', 'query', 'execution_time', 'rows_examined', 'rows_sent', 'is_slow',
+                 'efficiency_ratio', 'issues', 'recommendations', 'explanation', 'severity')
+    query_id: int
+    query: str
+    execution_time: float
+    rows_examined: int
+    rows_sent: int
+    is_slow: bool
+    efficiency_ratio: float
+    issues: List[str]
+    recommendations: Tuple[str, ...]
+    explanation: str
+    severity: str
+
+# Distinct query texts whose detected issues are remembered per analyzer
+ISSUE_CACHE_SIZE = 4096
+# Below this many queries, worker start-up costs more than the analysis itself
+PARALLEL_BATCH_MIN = 5000
 
 class QueryAnalyzer:
     """Advanced query analysis and recommendation engine."""
     
+    # Built once at import and shared by every analyzer
+    query_patterns = {
+        'missing_index': [
+            r'WHERE\s+\w+\s*=\s*\?',  # Simple equality without index
+            r'WHERE\s+\w+\s+IN\s*\(',  # IN clause without index
+            r'ORDER\s+BY\s+\w+',  # ORDER BY without index
+            r'GROUP\s+BY\s+\w+',  # GROUP BY without index
+        ],
+        'full_table_scan': [
+            r'WHERE\s+\w+\s+LIKE\s+[\'"]%',  # LIKE with leading wildcard
+            r'WHERE\s+\w+\s+!=',  # Not equal without index
+            r'WHERE\s+\w+\s+NOT\s+IN',  # NOT IN without index
+        ],
+        # Multi-clause patterns stop each gap at the next repeat of the clause that
+        # opened it, so a failed search stays linear instead of backtracking
+        'inefficient_joins': [
+            r'CROSS\s+JOIN',  # Cross joins
+            r'LEFT\s+JOIN(?:(?!LEFT\s+JOIN).)*?WHERE(?:(?!WHERE).)*?IS\s+NULL',  # Anti-joins
+            r'JOIN(?:(?!JOIN).)*?ON\s+\w+\.\w+\s*=\s*\w+\.\w+(?:(?!ON\s+\w+\.\w+\s*=\s*\w+\.\w+).)*?AND',  # Complex join conditions
+        ],
+        'subquery_issues': [
+            r'WHERE\s+\w+\s+IN\s*\(SELECT',  # IN subquery
+            r'WHERE\s+EXISTS\s*\(SELECT',  # EXISTS subquery
+            r'SELECT(?:(?!SELECT).)*?FROM\s*\(SELECT',  # Nested subqueries
+        ]
+    }
+    # One alternation per issue type so a single search classifies each category
+    _compiled_patterns = {
+        issue_type: re.compile(
+            "|".join(f"(?P<{issue_type}_{i}>{pattern})" for i, pattern in enumerate(patterns)),
+            re.IGNORECASE
+        )
+        for issue_type, patterns in query_patterns.items()
+    }
+    # Keywords every pattern of an issue type needs; a plain substring check
+    # rules a category out before its regex runs
+    _pattern_keywords = {
+        'missing_index': ('WHERE', 'ORDER', 'GROUP'),
+        'full_table_scan': ('WHERE',),
+        'inefficient_joins': ('JOIN',),
+        'subquery_issues': ('(SELECT',),
+    }
+    
+    # (severity, execution time in seconds, rows examined), most severe first
+    severity_thresholds = (
+        ('critical', 5.0, 5000000),
+        ('high', 2.0, 1000000),
+        ('medium', 1.0, 100000),
+    )
+    
+    issue_recommendations = {
+        'missing_index': (
+            "🔍 Add appropriate indexes to improve query performance",
+            "📊 Consider composite indexes for multi-column WHERE clauses",
+        ),
+        'full_table_scan': (
+            "⚠️ Avoid LIKE patterns with leading wildcards",
+            "🔧 Consider full-text search indexes for text searching",
+        ),
+        'inefficient_joins': (
+            "🔗 Optimize JOIN conditions and add foreign key indexes",
+            "📈 Consider query rewriting for better performance",
+        ),
+        'subquery_issues': (
+            "🔄 Consider rewriting subqueries as JOINs",
+            "⚡ Use EXISTS only when necessary, prefer JOINs for better performance",
+        ),
+    }
+    
+    # Sample problematic queries for demo
+    demo_queries = (
+        {
+            'id': 1001,
+            'query': "SELECT * FROM users WHERE email = 'user@example.com'",
+            'execution_time': 0.5,
+            'rows_examined': 1000000,
+            'rows_sent': 1,
+            'issues': ['missing_index'],
+            'explanation': "Query is slow because there's no index on the 'email' column, causing a full table scan of 1M rows."
+        },
+        {
+            'id': 1002,
+            'query': "SELECT u.*, p.* FROM users u LEFT JOIN posts p ON u.id = p.user_id WHERE u.created_at > '2024-01-01'",
+            'execution_time': 3.2,
+            'rows_examined': 5000000,
+            'rows_sent': 50000,
+            'issues': ['missing_index', 'inefficient_joins'],
+            'explanation': "Query is slow because: 1) No index on 'created_at' column, 2) LEFT JOIN without proper indexing on foreign key 'p.user_id'"
+        },
+        {
+            'id': 1003,
+            'query': "SELECT * FROM orders WHERE status IN ('pending', 'processing', 'shipped') ORDER BY created_at DESC",
+            'execution_time': 1.8,
+            'rows_examined': 2000000,
+            'rows_sent': 10000,
+            'issues': ['missing_index'],
+            'explanation': "Query is slow because there's no composite index on (status, created_at) columns for efficient filtering and sorting."
+        },
+        {
+            'id': 1004,
+            'query': "SELECT * FROM products WHERE name LIKE '%laptop%' AND category_id = 5",
+            'execution_time': 4.5,
+            'rows_examined': 3000000,
+            'rows_sent': 500,
+            'issues': ['full_table_scan', 'missing_index'],
+            'explanation': "Query is slow because: 1) LIKE with leading wildcard '%laptop%' prevents index usage, 2) No composite index on (category_id, name)"
+        },
+        {
+            'id': 1005,
+            'query': "SELECT COUNT(*) FROM orders o WHERE EXISTS (SELECT 1 FROM order_items oi WHERE oi.order_id = o.id AND oi.quantity > 10)",
+            'execution_time': 2.1,
+            'rows_examined': 1000000,
+            'rows_sent': 1,
+            'issues': ['subquery_issues'],
+            'explanation': "Query is slow because EXISTS subquery is not optimized. Consider using JOIN instead of EXISTS for better performance."
+        },
+        {
+            'id': 1006,
+            'query': "SELECT * FROM users WHERE age BETWEEN 18 AND 65 AND city = 'New York' ORDER BY last_login DESC LIMIT 100",
+            'execution_time': 0.8,
+            'rows_examined': 500000,
+            'rows_sent': 100,
+            'issues': ['missing_index'],
+            'explanation': "Query is slow because there's no composite index on (city, age, last_login) for efficient filtering, sorting, and limiting."
+        },
+        {
+            'id': 1007,
+            'query': "SELECT u.name, COUNT(p.id) as post_count FROM users u LEFT JOIN posts p ON u.id = p.user_id GROUP BY u.id HAVING post_count > 10",
+            'execution_time': 2.8,
+            'rows_examined': 4000000,
+            'rows_sent': 5000,
+            'issues': ['missing_index', 'inefficient_joins'],
+            'explanation': "Query is slow because: 1) No index on foreign key 'p.user_id', 2) GROUP BY without proper indexing, 3) Consider adding covering index on (user_id, id)"
+        },
+        {
+            'id': 1008,
+            'query': "SELECT * FROM logs WHERE log_level = 'ERROR' AND created_at >= DATE_SUB(NOW(), INTERVAL 1 DAY) ORDER BY created_at DESC",
+            'execution_time': 1.2,
+            'rows_examined': 800000,
+            'rows_sent': 2000,
+            'issues': ['missing_index'],
+            'explanation': "Query is slow because there's no composite index on (log_level, created_at) for efficient filtering and sorting."
+        },
+        {
+            'id': 1009,
+            'query': "UPDATE products SET price = price * 1.1 WHERE category_id = 3 AND in_stock = 1",
+            'execution_time': 3.5,
+            'rows_examined': 1500000,
+            'rows_sent': 0,
+            'issues': ['missing_index'],
+            'explanation': "Query is slow because there's no composite index on (category_id, in_stock) for efficient filtering during UPDATE operation."
+        },
+        {
+            'id': 1010,
+            'query': "SELECT DISTINCT user_id FROM orders WHERE total_amount > 1000 AND created_at > '2024-01-01'",
+            'execution_time': 2.3,
+            'rows_examined': 2000000,
+            'rows_sent': 15000,
+            'issues': ['missing_index'],
+            'explanation': "Query is slow because there's no composite index on (total_amount, created_at, user_id) for efficient filtering and DISTINCT operation."
+        }
+    )
+    
     def __init__(self):
         self.slow_query_threshold = 2.0  # seconds
-        self.query_patterns = {
-            'missing_index': [
-                r'WHERE\s+\w+\s*=\s*\?',  # Simple equality without index
-                r'WHERE\s+\w+\s+IN\s*\(',  # IN clause without index
-                r'ORDER\s+BY\s+\w+',  # ORDER BY without index
-                r'GROUP\s+BY\s+\w+',  # GROUP BY without index
-            ],
-            'full_table_scan': [
-                r'WHERE\s+\w+\s+LIKE\s+[\'"]%',  # LIKE with leading wildcard
-                r'WHERE\s+\w+\s+!=',  # Not equal without index
-                r'WHERE\s+\w+\s+NOT\s+IN',  # NOT IN without index
-            ],
-            'inefficient_joins': [
-                r'CROSS\s+JOIN',  # Cross joins
-                r'LEFT\s+JOIN.*WHERE.*IS\s+NULL',  # Anti-joins
-                r'JOIN.*ON\s+\w+\.\w+\s*=\s*\w+\.\w+.*AND',  # Complex join conditions
-            ],
-            'subquery_issues': [
-                r'WHERE\s+\w+\s+IN\s*\(SELECT',  # IN subquery
-                r'WHERE\s+EXISTS\s*\(SELECT',  # EXISTS subquery
-                r'SELECT.*FROM\s*\(SELECT',  # Nested subqueries
-            ]
-        }
-        
-        # Sample problematic queries for demo
-        self.demo_queries = [
-            {
-                'id': 1001,
-                'query': "SELECT * FROM users WHERE email = 'user@example.com'",
-                'execution_time': 0.5,
-                'rows_examined': 1000000,
-                'rows_sent': 1,
-                'issues': ['missing_index'],
-                'explanation': "Query is slow because there's no index on the 'email' column, causing a full table scan of 1M rows."
-            },
-            {
-                'id': 1002,
-                'query': "SELECT u.*, p.* FROM users u LEFT JOIN posts p ON u.id = p.user_id WHERE u.created_at > '2024-01-01'",
-                'execution_time': 3.2,
-                'rows_examined': 5000000,
-                'rows_sent': 50000,
-                'issues': ['missing_index', 'inefficient_joins'],
-                'explanation': "Query is slow because: 1) No index on 'created_at' column, 2) LEFT JOIN without proper indexing on foreign key 'p.user_id'"
-            },
-            {
-                'id': 1003,
-                'query': "SELECT * FROM orders WHERE status IN ('pending', 'processing', 'shipped') ORDER BY created_at DESC",
-                'execution_time': 1.8,
-                'rows_examined': 2000000,
-                'rows_sent': 10000,
-                'issues': ['missing_index'],
-                'explanation': "Query is slow because there's no composite index on (status, created_at) columns for efficient filtering and sorting."
-            },
-            {
-                'id': 1004,
-                'query': "SELECT * FROM products WHERE name LIKE '%laptop%' AND category_id = 5",
-                'execution_time': 4.5,
-                'rows_examined': 3000000,
-                'rows_sent': 500,
-                'issues': ['full_table_scan', 'missing_index'],
-                'explanation': "Query is slow because: 1) LIKE with leading wildcard '%laptop%' prevents index usage, 2) No composite index on (category_id, name)"
-            },
-            {
-                'id': 1005,
-                'query': "SELECT COUNT(*) FROM orders o WHERE EXISTS (SELECT 1 FROM order_items oi WHERE oi.order_id = o.id AND oi.quantity > 10)",
-                'execution_time': 2.1,
-                'rows_examined': 1000000,
-                'rows_sent': 1,
-                'issues': ['subquery_issues'],
-                'explanation': "Query is slow because EXISTS subquery is not optimized. Consider using JOIN instead of EXISTS for better performance."
-            },
-            {
-                'id': 1006,
-                'query': "SELECT * FROM users WHERE age BETWEEN 18 AND 65 AND city = 'New York' ORDER BY last_login DESC LIMIT 100",
-                'execution_time': 0.8,
-                'rows_examined': 500000,
-                'rows_sent': 100,
-                'issues': ['missing_index'],
-                'explanation': "Query is slow because there's no composite index on (city, age, last_login) for efficient filtering, sorting, and limiting."
-            },
-            {
-                'id': 1007,
-                'query': "SELECT u.name, COUNT(p.id) as post_count FROM users u LEFT JOIN posts p ON u.id = p.user_id GROUP BY u.id HAVING post_count > 10",
-                'execution_time': 2.8,
-                'rows_examined': 4000000,
-                'rows_sent': 5000,
-                'issues': ['missing_index', 'inefficient_joins'],
-                'explanation': "Query is slow because: 1) No index on foreign key 'p.user_id', 2) GROUP BY without proper indexing, 3) Consider adding covering index on (user_id, id)"
-            },
-            {
-                'id': 1008,
-                'query': "SELECT * FROM logs WHERE log_level = 'ERROR' AND created_at >= DATE_SUB(NOW(), INTERVAL 1 DAY) ORDER BY created_at DESC",
-                'execution_time': 1.2,
-                'rows_examined': 800000,
-                'rows_sent': 2000,
-                'issues': ['missing_index'],
-                'explanation': "Query is slow because there's no composite index on (log_level, created_at) for efficient filtering and sorting."
-            },
-            {
-                'id': 1009,
-                'query': "UPDATE products SET price = price * 1.1 WHERE category_id = 3 AND in_stock = 1",
-                'execution_time': 3.5,
-                'rows_examined': 1500000,
-                'rows_sent': 0,
-                'issues': ['missing_index'],
-                'explanation': "Query is slow because there's no composite index on (category_id, in_stock) for efficient filtering during UPDATE operation."
-            },
-            {
-                'id': 1010,
-                'query': "SELECT DISTINCT user_id FROM orders WHERE total_amount > 1000 AND created_at > '2024-01-01'",
-                'execution_time': 2.3,
-                'rows_examined': 2000000,
-                'rows_sent': 15000,
-                'issues': ['missing_index'],
-                'explanation': "Query is slow because there's no composite index on (total_amount, created_at, user_id) for efficient filtering and DISTINCT operation."
-            }
-        ]
+        # Repeated statements skip pattern matching entirely
+        self._classify_cached = functools.lru_cache(maxsize=ISSUE_CACHE_SIZE)(self._classify)
     
-    def analyze_query_performance(self, query_data: Dict) -> Dict:
+    def analyze_query_performance(self, query_data: Dict) -> 'QueryAnalysis':
         """Analyze a single query and provide detailed recommendations."""
-        analysis = {
-            'query_id': query_data['id'],
-            'query': query_data['query'],
-            'execution_time': query_data['execution_time'],
-            'rows_examined': query_data['rows_examined'],
-            'rows_sent': query_data['rows_sent'],
-            'is_slow': query_data['execution_time'] > self.slow_query_threshold,
-            'efficiency_ratio': query_data['rows_sent'] / query_data['rows_examined'] if query_data['rows_examined'] > 0 else 0,
-            'issues': [],
-            'recommendations': [],
-            'explanation': query_data.get('explanation', ''),
-            'severity': 'low'
-        }
-        
-        # Determine severity
-        if query_data['execution_time'] > 5.0 or query_data['rows_examined'] > 5000000:
-            analysis['severity'] = 'critical'
-        elif query_data['execution_time'] > 2.0 or query_data['rows_examined'] > 1000000:
-            analysis['severity'] = 'high'
-        elif query_data['execution_time'] > 1.0 or query_data['rows_examined'] > 100000:
-            analysis['severity'] = 'medium'
-        
-        # Analyze specific issues
-        for issue_type, patterns in self.query_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, query_data['query'], re.IGNORECASE):
-                    analysis['issues'].append(issue_type)
-                    break
+        analysis = QueryAnalysis(
+            query_id=query_data['id'],
+            query=query_data['query'],
+            execution_time=query_data['execution_time'],
+            rows_examined=query_data['rows_examined'],
+            rows_sent=query_data['rows_sent'],
+            is_slow=query_data['execution_time'] > self.slow_query_threshold,
+            efficiency_ratio=query_data['rows_sent'] / query_data['rows_examined'] if query_data['rows_examined'] > 0 else 0,
+            # Analyze specific issues
+            issues=list(self._classify_cached(query_data['query'])),
+            recommendations=(),
+            explanation=query_data.get('explanation', ''),
+            # Determine severity
+            severity=self._severity(query_data['execution_time'], query_data['rows_examined'])
+        )
         
         # Generate recommendations based on issues
-        analysis['recommendations'] = self._generate_recommendations(analysis)
+        analysis.recommendations = self._generate_recommendations(analysis)
         
         return analysis
     
-    def _generate_recommendations(self, analysis: Dict) -> List[str]:
+    def analyze_batch(self, queries: Sequence[Dict], workers: Optional[int] = None) -> List['QueryAnalysis']:
+        """Analyze many queries, spreading large batches across worker processes."""
+        workers = workers or os.cpu_count() or 1
+        if len(queries) < PARALLEL_BATCH_MIN or workers == 1:
+            return [self.analyze_query_performance(q) for q in queries]
+        # Pattern matching holds the GIL, so batches go to processes rather than threads
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.slow_query_threshold,)) as pool:
+            return list(pool.map(_analyze_in_worker, queries, chunksize=64))
+    
+    def _severity(self, execution_time: float, rows_examined: int) -> str:
+        """Return the first severity whose time or row threshold the query exceeds."""
+        for severity, max_time, max_rows in self.severity_thresholds:
+            if execution_time > max_time or rows_examined > max_rows:
+                return severity
+        return 'low'
+    
+    def _classify(self, query: str) -> Tuple[str, ...]:
+        """Return the issue types detected in a query, in pattern order."""
+        upper_query = query.upper()
+        return tuple(
+            issue_type for issue_type, regex in self._compiled_patterns.items()
+            if any(keyword in upper_query for keyword in self._pattern_keywords[issue_type]) and regex.search(query)
+        )
+    
+    def _generate_recommendations(self, analysis: 'QueryAnalysis') -> Tuple[str, ...]:
         """Generate specific recommendations based on detected issues."""
+        return self._recommendations_for(
+            tuple(analysis.issues),
+            analysis.efficiency_ratio < 0.01,
+            analysis.execution_time > 2.0
+        )
+    
+    @classmethod
+    @functools.lru_cache(maxsize=128)
+    def _recommendations_for(cls, issues: Tuple[str, ...], low_efficiency: bool, slow: bool) -> Tuple[str, ...]:
+        """Build the recommendation tuple once per distinct combination of findings."""
         recommendations = []
+        for issue_type in cls.issue_recommendations:
+            if issue_type in issues:
+                recommendations.extend(cls.issue_recommendations[issue_type])
         
-        if 'missing_index' in analysis['issues']:
-            recommendations.append("🔍 Add appropriate indexes to improve query performance")
-            recommendations.append("📊 Consider composite indexes for multi-column WHERE clauses")
-        
-        if 'full_table_scan' in analysis['issues']:
-            recommendations.append("⚠️ Avoid LIKE patterns with leading wildcards")
-            recommendations.append("🔧 Consider full-text search indexes for text searching")
-        
-        if 'inefficient_joins' in analysis['issues']:
-            recommendations.append("🔗 Optimize JOIN conditions and add foreign key indexes")
-            recommendations.append("📈 Consider query rewriting for better performance")
-        
-        if 'subquery_issues' in analysis['issues']:
-            recommendations.append("🔄 Consider rewriting subqueries as JOINs")
-            recommendations.append("⚡ Use EXISTS only when necessary, prefer JOINs for better performance")
-        
-        if analysis['efficiency_ratio'] < 0.01:
+        if low_efficiency:
             recommendations.append("📉 Very low efficiency ratio - consider adding WHERE clauses to reduce examined rows")
         
-        if analysis['execution_time'] > 2.0:
+        if slow:
             recommendations.append("⏱️ Query execution time exceeds 2 seconds - immediate optimization needed")
         
-        return recommendations
+        return tuple(recommendations)
     
-    def get_demo_queries(self, count: int = 10) -> List[Dict]:
+    def get_demo_queries(self, count: int = 10) -> Sequence[Dict]:
         """Get demo queries for testing."""
-        return random.sample(self.demo_queries, min(count, len(self.demo_queries)))
+        if count >= len(self.demo_queries):
+            # Asking for every query needs no sampling or copying
+            return self.demo_queries
+        import random  # only the demo path samples, so keep it off the import path
+        return random.sample(self.demo_queries, count)
     
-    def generate_query_summary(self, analyses: List[Dict]) -> Dict:
+    def generate_query_summary(self, analyses: List['QueryAnalysis']) -> Dict:
         """Generate a summary of all query analyses."""
         total_queries = len(analyses)
-        slow_queries = sum(1 for a in analyses if a['is_slow'])
-        critical_queries = sum(1 for a in analyses if a['severity'] == 'critical')
-        high_priority_queries = sum(1 for a in analyses if a['severity'] in ['critical', 'high'])
-        
-        issue_counts = {}
+        slow_queries = critical_queries = high_priority_queries = 0
+        total_execution_time = 0.0
+        total_rows_examined = total_rows_sent = 0
+        issue_counts = Counter()
         for analysis in analyses:
-            for issue in analysis['issues']:
-                issue_counts[issue] = issue_counts.get(issue, 0) + 1
+            if analysis.is_slow:
+                slow_queries += 1
+            severity = analysis.severity
+            if severity == 'critical':
+                critical_queries += 1
+                high_priority_queries += 1
+            elif severity == 'high':
+                high_priority_queries += 1
+            total_execution_time += analysis.execution_time
+            total_rows_examined += analysis.rows_examined
+            total_rows_sent += analysis.rows_sent
+            issue_counts.update(analysis.issues)
         
         return {
             'total_queries': total_queries,
@@ -224,8 +319,20 @@ class QueryAnalyzer:
             'critical_queries': critical_queries,
             'high_priority_queries': high_priority_queries,
             'slow_query_percentage': (slow_queries / total_queries * 100) if total_queries > 0 else 0,
-            'issue_counts': issue_counts,
-            'avg_execution_time': sum(a['execution_time'] for a in analyses) / total_queries if total_queries > 0 else 0,
-            'total_rows_examined': sum(a['rows_examined'] for a in analyses),
-            'total_rows_sent': sum(a['rows_sent'] for a in analyses)
+            'issue_counts': dict(issue_counts),
+            'avg_execution_time': total_execution_time / total_queries if total_queries > 0 else 0,
+            'total_rows_examined': total_rows_examined,
+            'total_rows_sent': total_rows_sent
         }
+
+
+_worker_analyzer: Optional[QueryAnalyzer] = None
+
+def _init_worker(slow_query_threshold: float) -> None:
+    """Give each worker process its own analyzer and issue cache."""
+    global _worker_analyzer
+    _worker_analyzer = QueryAnalyzer()
+    _worker_analyzer.slow_query_threshold = slow_query_threshold
+
+def _analyze_in_worker(query_data: Dict) -> QueryAnalysis:
+    return _worker_analyzer.analyze_query_performance(query_data)
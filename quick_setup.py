@@ -14,39 +14,47 @@ import sys
 import os
 
 def run_command(command, description):
-    """Run a command and show progress."""
-    print(f"🔄 {description}...")
+    """Run a command (an argv list, executed without a shell) and show progress."""
+    # Progress is overwritten in place by the result line
+    print(f"🔄 {description}...", end="\r", flush=True)
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        result = subprocess.run(command, check=True, capture_output=True, text=True,
+                                stdin=subprocess.DEVNULL)
         print(f"✅ {description} completed")
         return True
     except subprocess.CalledProcessError as e:
         print(f"❌ {description} failed: {e}")
         print(f"Error output: {e.stderr}")
         return False
+    except OSError as e:
+        print(f"❌ {description} failed: {e}")
+        return False
 
 def main():
     """Main setup function."""
-    print("🚀 Quick Setup for MySQL Observability Tool")
-    print("="*60)
+    print("\n".join([
+        "🚀 Quick Setup for MySQL Observability Tool",
+        "="*60
+    ]))
     
     # Step 1: Install dependencies
     print("\n1️⃣ Installing Python dependencies...")
-    if not run_command("pip install -r requirements.txt", "Installing dependencies"):
+    if not run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], "Installing dependencies"):
         print("❌ Failed to install dependencies. Please check your Python environment.")
         return
     
     # Step 2: Check MySQL connection
-    print("\n2️⃣ Checking MySQL connection...")
-    print("Please make sure MySQL is running and you have the connection details ready.")
-    
-    # Step 3: Run database setup
-    print("\n3️⃣ Setting up MySQL database...")
-    print("This will create a test database with millions of rows and slow queries.")
+    print("\n".join([
+        "\n2️⃣ Checking MySQL connection...",
+        "Please make sure MySQL is running and you have the connection details ready.",
+        # Step 3: Run database setup
+        "\n3️⃣ Setting up MySQL database...",
+        "This will create a test database with millions of rows and slow queries."
+    ]))
     
     response = input("Do you want to proceed with database setup? (y/n): ").strip().lower()
     if response == 'y':
-        if not run_command("python setup_mysql_database.py", "Database setup"):
+        if not run_command([sys.executable, "setup_mysql_database.py"], "Database setup"):
             print("❌ Database setup failed. Please check your MySQL connection.")
             return
     else:
@@ -56,31 +64,33 @@ def main():
     print("\n4️⃣ Testing the tool...")
     
     # Test basic functionality
-    if run_command("python p3cli.py --config", "Testing basic configuration"):
+    if run_command([sys.executable, "p3cli.py", "--config"], "Testing basic configuration"):
         print("✅ Basic tool functionality working")
     
     # Test query analysis
-    if run_command("python p3cli.py --analyze-queries", "Testing query analysis"):
+    if run_command([sys.executable, "p3cli.py", "--analyze-queries"], "Testing query analysis"):
         print("✅ Query analysis working")
     
     # Test OpenAI integration (if configured)
-    if run_command("python p3cli.py --ask 'What is MySQL?'", "Testing OpenAI integration"):
+    if run_command([sys.executable, "p3cli.py", "--ask", "What is MySQL?"], "Testing OpenAI integration"):
         print("✅ OpenAI integration working")
     else:
         print("⚠️ OpenAI integration not configured. Run: python setup_openai.py")
     
-    print("\n" + "="*60)
-    print("🎉 SETUP COMPLETE!")
-    print("="*60)
-    print("Your MySQL observability tool is ready!")
-    print("\nAvailable commands:")
-    print("  python p3cli.py --monitor              # Basic metrics")
-    print("  python p3cli.py --analyze              # Anomaly detection")
-    print("  python p3cli.py --analyze-queries      # Query analysis")
-    print("  python p3cli.py --ask 'question'       # Ask AI (if configured)")
-    print("  python p3cli.py --ai-analysis          # AI analysis (if configured)")
-    print("\nFor OpenAI setup: python setup_openai.py")
-    print("For database setup: python setup_mysql_database.py")
+    print("\n".join([
+        "\n" + "="*60,
+        "🎉 SETUP COMPLETE!",
+        "="*60,
+        "Your MySQL observability tool is ready!",
+        "\nAvailable commands:",
+        "  python p3cli.py --monitor              # Basic metrics",
+        "  python p3cli.py --analyze              # Anomaly detection",
+        "  python p3cli.py --analyze-queries      # Query analysis",
+        "  python p3cli.py --ask 'question'       # Ask AI (if configured)",
+        "  python p3cli.py --ai-analysis          # AI analysis (if configured)",
+        "\nFor OpenAI setup: python setup_openai.py",
+        "For database setup: python setup_mysql_database.py"
+    ]))
 
 if __name__ == "__main__":
     main()
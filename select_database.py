@@ -4,35 +4,40 @@ Database Selection Script for AI-Powered MySQL Observability CLI
 This script helps you select which database to work with.
 """
 
-import json
-import mysql.connector
 from typing import List, Dict
 
-def get_available_databases(host: str, port: int, user: str, password: str) -> List[str]:
+from config_io import edit_json, read_json
+
+# Schemas created by MySQL itself, never offered for selection
+SYSTEM_DATABASES = ('information_schema', 'performance_schema', 'mysql', 'sys')
+
+def _connect(host: str, port: int, user: str, password: str):
+    """Open the one server connection shared by listing and testing databases."""
+    import mysql.connector  # deferred so the script starts without loading the driver
+    return mysql.connector.connect(
+        host=host,
+        port=port,
+        user=user,
+        password=password
+    )
+
+def get_available_databases(connection) -> List[str]:
     """Get list of available databases from MySQL server."""
+    # Filter out system databases on the server so they are never sent back
+    placeholders = ", ".join(["%s"] * len(SYSTEM_DATABASES))
+    cursor = connection.cursor()
     try:
-        connection = mysql.connector.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password
+        cursor.execute(
+            "SELECT SCHEMA_NAME FROM information_schema.SCHEMATA "
+            f"WHERE SCHEMA_NAME NOT IN ({placeholders}) ORDER BY SCHEMA_NAME",
+            SYSTEM_DATABASES
         )
-        
-        cursor = connection.cursor()
-        cursor.execute("SHOW DATABASES")
-        databases = [row[0] for row in cursor.fetchall()]
-        
-        # Filter out system databases
-        system_dbs = {'information_schema', 'performance_schema', 'mysql', 'sys'}
-        user_databases = [db for db in databases if db not in system_dbs]
-        
-        cursor.close()
-        connection.close()
-        
-        return user_databases
+        return [row[0] for row in cursor]
     except Exception as e:
-        print(f"Error connecting to MySQL: {e}")
+        print(f"Error listing databases: {e}")
         return []
+    finally:
+        cursor.close()
 
 def display_databases(databases: List[str]) -> None:
     """Display available databases in a nice format."""
@@ -69,35 +74,24 @@ def select_database(databases: List[str]) -> str:
 def update_config(database: str) -> None:
     """Update config.json with selected database."""
     try:
-        with open('config.json', 'r') as f:
-            config = json.load(f)
-        
-        config['mysql']['database'] = database
-        
-        with open('config.json', 'w') as f:
-            json.dump(config, f, indent=2)
+        with edit_json() as config:
+            config['mysql']['database'] = database
         
         print(f"✅ Updated config.json to use database: {database}")
     except Exception as e:
         print(f"Error updating config: {e}")
 
-def test_database_connection(database: str, host: str, port: int, user: str, password: str) -> bool:
+def test_database_connection(connection, database: str) -> bool:
     """Test connection to selected database."""
     try:
-        connection = mysql.connector.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database
-        )
+        # The user may have spent a while choosing; reconnect if the server dropped us
+        connection.ping(reconnect=True)
+        connection.database = database
         
         cursor = connection.cursor()
         cursor.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = %s", (database,))
         table_count = cursor.fetchone()[0]
-        
         cursor.close()
-        connection.close()
         
         print(f"✅ Successfully connected to '{database}'")
         print(f"📊 Found {table_count} tables in the database")
@@ -113,8 +107,7 @@ def main():
     
     # Load current config
     try:
-        with open('config.json', 'r') as f:
-            config = json.load(f)
+        config = read_json()
     except FileNotFoundError:
         print("❌ config.json not found! Please run setup first.")
         return
@@ -133,23 +126,35 @@ def main():
     
     # Get available databases
     print("\n🔍 Fetching available databases...")
-    databases = get_available_databases(host, port, user, password)
-    
-    if not databases:
+    try:
+        connection = _connect(host, port, user, password)
+    except Exception as e:
+        print(f"Error connecting to MySQL: {e}")
         print("❌ No databases found or connection failed.")
         return
     
-    # Display databases
-    display_databases(databases)
-    
-    # Let user select
-    selected_db = select_database(databases)
-    if not selected_db:
-        return
+    try:
+        databases = get_available_databases(connection)
+        
+        if not databases:
+            print("❌ No databases found or connection failed.")
+            return
+        
+        # Display databases
+        display_databases(databases)
+        
+        # Let user select
+        selected_db = select_database(databases)
+        if not selected_db:
+            return
+        
+        # Test connection
+        print(f"\n🧪 Testing connection to '{selected_db}'...")
+        connected = test_database_connection(connection, selected_db)
+    finally:
+        connection.close()
     
-    # Test connection
-    print(f"\n🧪 Testing connection to '{selected_db}'...")
-    if test_database_connection(selected_db, host, port, user, password):
+    if connected:
         # Update config
         update_config(selected_db)
         
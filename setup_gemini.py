@@ -5,20 +5,22 @@ Gemini Pro Setup Script
 This script helps you set up Gemini Pro API integration for the MySQL observability tool.
 """
 
-import json
 import os
 
+from config_io import edit_json
+
 def setup_gemini():
     """Set up Gemini Pro API configuration."""
-    print("🚀 Gemini Pro Setup for MySQL Observability Tool")
-    print("="*60)
-    
-    # Get API key
-    print("\n1. Get your Gemini Pro API key:")
-    print("   • Go to: https://makersuite.google.com/app/apikey")
-    print("   • Sign in with your Google account")
-    print("   • Click 'Create API Key'")
-    print("   • Copy the generated API key")
+    print("\n".join([
+        "🚀 Gemini Pro Setup for MySQL Observability Tool",
+        "="*60,
+        # Get API key
+        "\n1. Get your Gemini Pro API key:",
+        "   • Go to: https://makersuite.google.com/app/apikey",
+        "   • Sign in with your Google account",
+        "   • Click 'Create API Key'",
+        "   • Copy the generated API key"
+    ]))
     
     api_key = input("\n2. Enter your Gemini Pro API key: ").strip()
     
@@ -26,26 +28,18 @@ def setup_gemini():
         print("❌ No API key provided. Exiting.")
         return
     
-    # Load current config
+    # Update config in one read and one atomic write
     try:
-        with open('config.json', 'r') as f:
-            config = json.load(f)
+        with edit_json() as config:
+            config.setdefault('gemini', {}).update(
+                api_key=api_key,
+                model='gemini-pro',
+                enabled=True
+            )
     except FileNotFoundError:
         print("❌ config.json not found. Please run the main setup first.")
         return
     
-    # Update config
-    if 'gemini' not in config:
-        config['gemini'] = {}
-    
-    config['gemini']['api_key'] = api_key
-    config['gemini']['model'] = 'gemini-pro'
-    config['gemini']['enabled'] = True
-    
-    # Save config
-    with open('config.json', 'w') as f:
-        json.dump(config, f, indent=2)
-    
     print("\n✅ Gemini Pro configuration updated!")
     
     # Test the connection
@@ -68,18 +62,20 @@ def setup_gemini():
         print("Please check your API key and try again.")
         return
     
-    print("\n" + "="*60)
-    print("🎉 GEMINI PRO SETUP COMPLETE!")
-    print("="*60)
-    print("Your MySQL observability tool now supports:")
-    print("✅ Gemini Pro AI analysis")
-    print("✅ Natural language query explanations")
-    print("✅ Advanced performance recommendations")
-    print("✅ Conversational database consulting")
-    print("\nYou can now run:")
-    print("  python p3cli.py --ask 'Why is my query slow?'")
-    print("  python p3cli.py --analyze-queries")
-    print("  python p3cli.py --ai-analysis")
+    print("\n".join([
+        "\n" + "="*60,
+        "🎉 GEMINI PRO SETUP COMPLETE!",
+        "="*60,
+        "Your MySQL observability tool now supports:",
+        "✅ Gemini Pro AI analysis",
+        "✅ Natural language query explanations",
+        "✅ Advanced performance recommendations",
+        "✅ Conversational database consulting",
+        "\nYou can now run:",
+        "  python p3cli.py --ask 'Why is my query slow?'",
+        "  python p3cli.py --analyze-queries",
+        "  python p3cli.py --ai-analysis"
+    ]))
 
 if __name__ == "__main__":
     setup_gemini()
@@ -10,10 +10,170 @@ This script creates a MySQL database with:
 """
 
 import mysql.connector
-import random
+import numpy as np
+import os
+import tempfile
 import time
-from datetime import datetime, timedelta
-import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import chain, repeat
+
+from config_io import edit_json
+
+# Upper bound on rows per multi-row INSERT statement
+BULK_INSERT_ROWS = 2000
+
+# Server globals raised for the duration of the load when currently lower;
+# restore_server_limits puts back the previous values afterwards
+LOAD_SERVER_LIMITS = {
+    # MySQL 8's default; lets multi-row INSERT batches reach BULK_INSERT_ROWS
+    'max_allowed_packet': 64 * 1024 * 1024,
+    'net_buffer_length': 1024 * 1024,
+}
+
+# Rough size of the ~200k sample rows plus their indexes; a smaller InnoDB
+# buffer pool is only reported, since resizing it is the server owner's call
+LOAD_WORKING_SET_BYTES = 256 * 1024 * 1024
+
+# Rows generated and loaded at a time, so a table is never held in memory whole
+SAMPLE_CHUNK_ROWS = 10000
+
+def _tsv_field(value) -> str:
+    """Format one value for LOAD DATA's default tab-separated, backslash-escaped layout."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+# Sample data lists
+CITIES = ['New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix', 'Philadelphia', 
+          'San Antonio', 'San Diego', 'Dallas', 'San Jose', 'Austin', 'Jacksonville',
+          'Fort Worth', 'Columbus', 'Charlotte', 'San Francisco', 'Indianapolis',
+          'Seattle', 'Denver', 'Washington', 'Boston', 'El Paso', 'Nashville',
+          'Detroit', 'Oklahoma City', 'Portland', 'Las Vegas', 'Memphis', 'Louisville']
+
+COUNTRIES = ['USA', 'Canada', 'Mexico', 'UK', 'Germany', 'France', 'Italy', 'Spain',
+             'Australia', 'Japan', 'China', 'India', 'Brazil', 'Argentina']
+
+PRODUCT_CATEGORIES = ['Electronics', 'Clothing', 'Books', 'Home & Garden', 'Sports',
+                      'Beauty', 'Toys', 'Automotive', 'Health', 'Food']
+
+PRODUCT_NAMES = ['Laptop', 'Smartphone', 'Headphones', 'Tablet', 'Camera', 'Watch',
+                 'Shoes', 'Shirt', 'Jeans', 'Jacket', 'Book', 'Notebook', 'Pen',
+                 'Chair', 'Table', 'Lamp', 'Plant', 'Tool', 'Game', 'Toy']
+
+LOG_MESSAGES = [
+    'User login successful', 'Database connection established', 'Query executed',
+    'File uploaded', 'Email sent', 'Payment processed', 'Order created',
+    'User registered', 'Password changed', 'Profile updated', 'Search performed',
+    'Error occurred', 'Warning generated', 'Debug information', 'System started'
+]
+
+# Each column is drawn in one NumPy call instead of one random.* call per row;
+# .tolist() hands the connector plain Python ints, floats, bools and strs.
+# A generator builds the rows numbered start..stop-1 of its table.
+
+def _days_before(now, days):
+    """Timestamps `days` whole days before `now` (a datetime64), as datetime objects."""
+    # One vectorised subtraction; datetime64[us].tolist() yields datetime.datetime
+    return (now - days.astype('timedelta64[D]')).astype('datetime64[us]').tolist()
+
+# The JSON payloads are tiny and fixed-shape, so they are formatted directly
+# rather than built as dicts and run through json.dumps per row
+USER_PROFILE_JSON = '{"preferences":{"theme":"dark","notifications":true}}'
+
+def _generate_users(rng, now, start, stop):
+    n = stop - start
+    return list(zip(
+        [f"user{i}@example.com" for i in range(start, stop)],
+        [f"User {i}" for i in range(start, stop)],
+        rng.integers(18, 81, size=n).tolist(),
+        rng.choice(CITIES, size=n).tolist(),
+        rng.choice(COUNTRIES, size=n).tolist(),
+        _days_before(now, rng.integers(1, 366, size=n)),
+        _days_before(now, rng.integers(0, 31, size=n)),
+        rng.integers(0, 2, size=n).astype(bool).tolist(),
+        [USER_PROFILE_JSON] * n
+    ))
+
+def _generate_products(rng, now, start, stop):
+    n = stop - start
+    return list(zip(
+        [f"{name} {i}" for i, name in enumerate(rng.choice(PRODUCT_NAMES, size=n).tolist(), start)],
+        [f"Description for product {i}" for i in range(start, stop)],
+        rng.integers(1, len(PRODUCT_CATEGORIES) + 1, size=n).tolist(),
+        rng.uniform(10, 1000, size=n).round(2).tolist(),
+        rng.integers(0, 2, size=n).astype(bool).tolist(),
+        _days_before(now, rng.integers(1, 366, size=n)),
+        [f'{{"brand":"Brand{i%100}","rating":{rating}}}'
+         for i, rating in enumerate(rng.uniform(1, 5, size=n).round(1).tolist(), start)]
+    ))
+
+def _generate_orders(rng, now, start, stop):
+    n = stop - start
+    return list(zip(
+        rng.integers(1, 10001, size=n).tolist(),
+        rng.uniform(10, 5000, size=n).round(2).tolist(),
+        rng.choice(['pending', 'processing', 'shipped', 'delivered', 'cancelled'], size=n).tolist(),
+        _days_before(now, rng.integers(1, 366, size=n)),
+        [f"Address {i}" for i in range(start, stop)],
+        rng.choice(['credit_card', 'paypal', 'bank_transfer'], size=n).tolist()
+    ))
+
+def _generate_order_items(rng, now, start, stop):
+    n = stop - start
+    return list(zip(
+        rng.integers(1, 20001, size=n).tolist(),
+        rng.integers(1, 5001, size=n).tolist(),
+        rng.integers(1, 11, size=n).tolist(),
+        rng.uniform(5, 500, size=n).round(2).tolist()
+    ))
+
+def _generate_posts(rng, now, start, stop):
+    n = stop - start
+    return list(zip(
+        rng.integers(1, 10001, size=n).tolist(),
+        [f"Post Title {i}" for i in range(start, stop)],
+        [f"This is the content of post {i}. " * times
+         for i, times in enumerate(rng.integers(5, 21, size=n).tolist(), start)],
+        rng.integers(0, 2, size=n).astype(bool).tolist(),
+        _days_before(now, rng.integers(1, 366, size=n)),
+        rng.integers(0, 10001, size=n).tolist()
+    ))
+
+def _generate_logs(rng, now, start, stop):
+    n = stop - start
+    return list(zip(
+        rng.choice(['DEBUG', 'INFO', 'WARN', 'ERROR', 'FATAL'], size=n).tolist(),
+        rng.choice(LOG_MESSAGES, size=n).tolist(),
+        rng.integers(1, 10001, size=n).tolist(),
+        _days_before(now, rng.integers(1, 31, size=n)),
+        [f'{{"request_id":"req_{i}","duration":{duration}}}'
+         for i, duration in enumerate(rng.integers(1, 1001, size=n).tolist(), start)]
+    ))
+
+# table -> (row count, columns, row generator, load with LOAD DATA LOCAL INFILE)
+SAMPLE_TABLES = {
+    'users': (10000, ('email', 'name', 'age', 'city', 'country', 'created_at', 'last_login',
+                      'is_active', 'profile_data'), _generate_users, False),
+    'products': (5000, ('name', 'description', 'category_id', 'price', 'in_stock', 'created_at',
+                        'metadata'), _generate_products, False),
+    'orders': (20000, ('user_id', 'total_amount', 'status', 'created_at', 'shipping_address',
+                       'payment_method'), _generate_orders, False),
+    'order_items': (50000, ('order_id', 'product_id', 'quantity', 'price'), _generate_order_items, True),
+    'posts': (10000, ('user_id', 'title', 'content', 'published', 'created_at', 'view_count'),
+              _generate_posts, False),
+    'logs': (100000, ('log_level', 'message', 'user_id', 'created_at', 'metadata'), _generate_logs, True),
+}
+
+# Secondary indexes, created by create_indexes after the bulk load
+SAMPLE_INDEXES = (
+    "CREATE INDEX idx_users_email ON users(email)",
+    "CREATE INDEX idx_orders_user_id ON orders(user_id)",
+    "CREATE INDEX idx_products_category_id ON products(category_id)",
+    "CREATE INDEX idx_logs_created_at ON logs(created_at)",
+)
 
 class FastMySQLSetup:
     """Fast setup MySQL database with test data."""
@@ -28,16 +188,30 @@ class FastMySQLSetup:
             'database': 'observability_test'
         }
         self.connection = None
+        self._max_packet = None
+        # None until the server's local_infile setting has been checked
+        self._local_infile = None
+        # Server globals changed by raise_server_limits, with their previous values
+        self._raised_limits = {}
+    
+    def _open_connection(self, database=None):
+        connection = mysql.connector.connect(
+            host=self.config['host'],
+            port=self.config['port'],
+            user=self.config['user'],
+            password=self.config['password'],
+            database=database,
+            # Lets the largest tables stream in via LOAD DATA LOCAL INFILE
+            allow_local_infile=True
+        )
+        # Each table's insert batches share one transaction, committed once per table
+        connection.autocommit = False
+        return connection
     
     def connect(self):
         """Connect to MySQL server."""
         try:
-            self.connection = mysql.connector.connect(
-                host=self.config['host'],
-                port=self.config['port'],
-                user=self.config['user'],
-                password=self.config['password']
-            )
+            self.connection = self._open_connection()
             print("✅ Connected to MySQL server")
             return True
         except mysql.connector.Error as e:
@@ -62,8 +236,9 @@ class FastMySQLSetup:
         try:
             cursor = self.connection.cursor()
             
-            # Users table
-            cursor.execute("""
+            # All six tables go to the server in one multi-statement round trip
+            for _ in cursor.execute("""
+                -- Users table
                 CREATE TABLE users (
                     id INT PRIMARY KEY AUTO_INCREMENT,
                     email VARCHAR(255) NOT NULL,
@@ -75,11 +250,9 @@ class FastMySQLSetup:
                     last_login TIMESTAMP,
                     is_active BOOLEAN DEFAULT TRUE,
                     profile_data JSON
-                )
-            """)
-            
-            # Products table
-            cursor.execute("""
+                );
+                
+                -- Products table
                 CREATE TABLE products (
                     id INT PRIMARY KEY AUTO_INCREMENT,
                     name VARCHAR(255) NOT NULL,
@@ -90,11 +263,9 @@ class FastMySQLSetup:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                     metadata JSON
-                )
-            """)
-            
-            # Orders table
-            cursor.execute("""
+                );
+                
+                -- Orders table
                 CREATE TABLE orders (
                     id INT PRIMARY KEY AUTO_INCREMENT,
                     user_id INT,
@@ -104,11 +275,9 @@ class FastMySQLSetup:
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                     shipping_address TEXT,
                     payment_method VARCHAR(50)
-                )
-            """)
-            
-            # Order items table
-            cursor.execute("""
+                );
+                
+                -- Order items table
                 CREATE TABLE order_items (
                     id INT PRIMARY KEY AUTO_INCREMENT,
                     order_id INT,
@@ -116,11 +285,9 @@ class FastMySQLSetup:
                     quantity INT,
                     price DECIMAL(10,2),
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Posts table
-            cursor.execute("""
+                );
+                
+                -- Posts table
                 CREATE TABLE posts (
                     id INT PRIMARY KEY AUTO_INCREMENT,
                     user_id INT,
@@ -130,11 +297,9 @@ class FastMySQLSetup:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                     view_count INT DEFAULT 0
-                )
-            """)
-            
-            # Logs table
-            cursor.execute("""
+                );
+                
+                -- Logs table
                 CREATE TABLE logs (
                     id INT PRIMARY KEY AUTO_INCREMENT,
                     log_level ENUM('DEBUG', 'INFO', 'WARN', 'ERROR', 'FATAL'),
@@ -143,7 +308,8 @@ class FastMySQLSetup:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     metadata JSON
                 )
-            """)
+            """, multi=True):
+                pass
             
             print("✅ Created all tables")
             return True
@@ -152,152 +318,206 @@ class FastMySQLSetup:
             print(f"❌ Error creating tables: {e}")
             return False
     
-    def generate_sample_data(self):
-        """Generate realistic sample data (smaller dataset)."""
-        print("🔄 Generating sample data (fast version)...")
-        
+    def _max_packet_bytes(self, cursor) -> int:
+        """Return the server's max_allowed_packet, or MySQL 5.7's 4 MB default if unknown."""
+        try:
+            cursor.execute("SHOW VARIABLES LIKE 'max_allowed_packet'")
+            row = cursor.fetchone()
+            return int(row[1])
+        except (mysql.connector.Error, TypeError, ValueError):
+            return 4 * 1024 * 1024
+    
+    def _server_globals(self, cursor, names):
+        """Return the current global values of the named server variables as ints."""
+        placeholders = ", ".join(["%s"] * len(names))
+        cursor.execute(f"SHOW GLOBAL VARIABLES WHERE Variable_name IN ({placeholders})", tuple(names))
+        return {name: int(value) for name, value in cursor.fetchall()}
+    
+    def raise_server_limits(self):
+        """Raise the LOAD_SERVER_LIMITS globals that are below their targets.
+
+        Each SET GLOBAL needs SUPER (or SYSTEM_VARIABLES_ADMIN) and is tried on its
+        own; the previous value of every one that succeeds is kept for
+        restore_server_limits.
+        """
         cursor = self.connection.cursor()
+        try:
+            current = self._server_globals(cursor, list(LOAD_SERVER_LIMITS) + ['innodb_buffer_pool_size'])
+        except (mysql.connector.Error, ValueError) as e:
+            print(f"  ⚠️ Could not read server limits ({e}); keeping them as they are")
+            cursor.close()
+            return
         
-        # Sample data lists
-        cities = ['New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix', 'Philadelphia', 
-                 'San Antonio', 'San Diego', 'Dallas', 'San Jose', 'Austin', 'Jacksonville',
-                 'Fort Worth', 'Columbus', 'Charlotte', 'San Francisco', 'Indianapolis',
-                 'Seattle', 'Denver', 'Washington', 'Boston', 'El Paso', 'Nashville',
-                 'Detroit', 'Oklahoma City', 'Portland', 'Las Vegas', 'Memphis', 'Louisville']
-        
-        countries = ['USA', 'Canada', 'Mexico', 'UK', 'Germany', 'France', 'Italy', 'Spain',
-                    'Australia', 'Japan', 'China', 'India', 'Brazil', 'Argentina']
-        
-        product_categories = ['Electronics', 'Clothing', 'Books', 'Home & Garden', 'Sports',
-                             'Beauty', 'Toys', 'Automotive', 'Health', 'Food']
-        
-        product_names = ['Laptop', 'Smartphone', 'Headphones', 'Tablet', 'Camera', 'Watch',
-                        'Shoes', 'Shirt', 'Jeans', 'Jacket', 'Book', 'Notebook', 'Pen',
-                        'Chair', 'Table', 'Lamp', 'Plant', 'Tool', 'Game', 'Toy']
-        
-        log_messages = [
-            'User login successful', 'Database connection established', 'Query executed',
-            'File uploaded', 'Email sent', 'Payment processed', 'Order created',
-            'User registered', 'Password changed', 'Profile updated', 'Search performed',
-            'Error occurred', 'Warning generated', 'Debug information', 'System started'
-        ]
-        
-        # Generate users (10K records)
-        print("  📊 Generating 10,000 users...")
-        users_data = []
-        for i in range(10000):
-            users_data.append((
-                f"user{i}@example.com",
-                f"User {i}",
-                random.randint(18, 80),
-                random.choice(cities),
-                random.choice(countries),
-                datetime.now() - timedelta(days=random.randint(1, 365)),
-                datetime.now() - timedelta(days=random.randint(0, 30)),
-                random.choice([True, False]),
-                json.dumps({"preferences": {"theme": "dark", "notifications": True}})
-            ))
-        
-        cursor.executemany("""
-            INSERT INTO users (email, name, age, city, country, created_at, last_login, is_active, profile_data)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, users_data)
-        self.connection.commit()
-        
-        # Generate products (5K records)
-        print("  📊 Generating 5,000 products...")
-        products_data = []
-        for i in range(5000):
-            products_data.append((
-                f"{random.choice(product_names)} {i}",
-                f"Description for product {i}",
-                random.randint(1, len(product_categories)),
-                round(random.uniform(10, 1000), 2),
-                random.choice([True, False]),
-                datetime.now() - timedelta(days=random.randint(1, 365)),
-                json.dumps({"brand": f"Brand{i%100}", "rating": round(random.uniform(1, 5), 1)})
-            ))
+        buffer_pool = current.get('innodb_buffer_pool_size', LOAD_WORKING_SET_BYTES)
+        if buffer_pool < LOAD_WORKING_SET_BYTES:
+            print(f"  ⚠️ innodb_buffer_pool_size is {buffer_pool:,} bytes, below the "
+                  f"~{LOAD_WORKING_SET_BYTES:,} the sample data needs; the load may hit disk")
         
-        cursor.executemany("""
-            INSERT INTO products (name, description, category_id, price, in_stock, created_at, metadata)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, products_data)
-        self.connection.commit()
+        for name, target in LOAD_SERVER_LIMITS.items():
+            if name not in current or current[name] >= target:
+                continue
+            try:
+                cursor.execute(f"SET GLOBAL {name} = {target}")
+            except mysql.connector.Error as e:
+                print(f"  ⚠️ Could not raise {name} ({e}); keeping {current[name]:,}")
+                continue
+            self._raised_limits[name] = current[name]
+            print(f"✅ Raised {name} from {current[name]:,} to {target:,} for the load")
+        cursor.close()
         
-        # Generate orders (20K records)
-        print("  📊 Generating 20,000 orders...")
-        orders_data = []
-        for i in range(20000):
-            orders_data.append((
-                random.randint(1, 10000),
-                round(random.uniform(10, 5000), 2),
-                random.choice(['pending', 'processing', 'shipped', 'delivered', 'cancelled']),
-                datetime.now() - timedelta(days=random.randint(1, 365)),
-                f"Address {i}",
-                random.choice(['credit_card', 'paypal', 'bank_transfer'])
-            ))
-        
-        cursor.executemany("""
-            INSERT INTO orders (user_id, total_amount, status, created_at, shipping_address, payment_method)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, orders_data)
-        self.connection.commit()
+        if 'max_allowed_packet' in self._raised_limits:
+            # Global packet limits only apply to new sessions
+            self.connection.close()
+            self.connection = self._open_connection(self.config['database'])
+            self._max_packet = None
+    
+    def restore_server_limits(self):
+        """Put back every global that raise_server_limits changed."""
+        if not self._raised_limits:
+            return
+        cursor = self.connection.cursor()
+        for name, value in self._raised_limits.items():
+            try:
+                cursor.execute(f"SET GLOBAL {name} = {value}")
+            except mysql.connector.Error as e:
+                print(f"  ⚠️ Could not restore {name} to {value:,}: {e}")
+        cursor.close()
+        self._raised_limits = {}
+        print("✅ Restored server limits")
+    
+    def _bulk_insert(self, cursor, table, columns, rows, prepared=None):
+        """Insert rows with multi-row INSERT ... VALUES statements.
+
+        Each statement carries up to BULK_INSERT_ROWS rows, fewer if the rows are wide
+        enough that the statement could outgrow max_allowed_packet. Full-size batches
+        go through the `prepared` cursor when one is given, so the server parses that
+        statement once per table; the shorter final batch uses `cursor`.
+        """
+        if not rows:
+            return
+        if self._max_packet is None:
+            self._max_packet = self._max_packet_bytes(cursor)
+        # Size batches from the widest of the leading rows, doubled to leave room for escaping
+        row_bytes = 2 * max(sum(len(str(value)) + 4 for value in row) for row in rows[:BULK_INSERT_ROWS])
+        batch_size = max(1, min(BULK_INSERT_ROWS, self._max_packet // row_bytes))
+        placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        prefix = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+        full_sql = None
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            if len(chunk) == batch_size:
+                if full_sql is None:
+                    full_sql = prefix + ", ".join([placeholders] * batch_size)
+                (prepared or cursor).execute(full_sql, list(chain.from_iterable(chunk)))
+            else:
+                cursor.execute(prefix + ", ".join([placeholders] * len(chunk)),
+                               list(chain.from_iterable(chunk)))
+    
+    def _server_allows_local_infile(self, cursor) -> bool:
+        """Check local_infile before any rows are generated for LOAD DATA.
+
+        MySQL 8 ships with local_infile=OFF; finding out up front avoids
+        generating a table's rows for a load the server is going to refuse.
+        """
+        try:
+            cursor.execute("SHOW GLOBAL VARIABLES LIKE 'local_infile'")
+            row = cursor.fetchone()
+        except mysql.connector.Error:
+            return True  # unknown; let the LOAD DATA attempt decide
+        if row and str(row[1]).upper() in ('OFF', '0'):
+            print("  ⚠️ Server has local_infile=OFF; using multi-row INSERTs")
+            return False
+        return True
+    
+    def _load_data_local(self, cursor, table, columns, chunks):
+        """Stream chunks of rows into a table with LOAD DATA LOCAL INFILE.
+
+        Returns False, without loading anything, if the server or client refuses
+        local infile so the caller can fall back to _bulk_insert.
+        """
+        if self._local_infile is None:
+            self._local_infile = self._server_allows_local_infile(cursor)
+        if not self._local_infile:
+            return False
+        fd, path = tempfile.mkstemp(suffix='.tsv')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+                for rows in chunks:
+                    f.writelines("\t".join(map(_tsv_field, row)) + "\n" for row in rows)
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                (path,)
+            )
+            return True
+        except mysql.connector.Error as e:
+            print(f"  ⚠️ LOAD DATA LOCAL INFILE unavailable ({e}); using multi-row INSERTs")
+            self._local_infile = False
+            return False
+        finally:
+            os.remove(path)
+    
+    def load_table(self, table, seed):
+        """Generate one sample table's rows chunk by chunk and load them, committing once.
+
+        `seed` is the table's SeedSequence; a fallback to multi-row INSERTs restarts
+        from it, so the rows are the same whichever way they are loaded.
+        """
+        count, columns, generate, use_infile = SAMPLE_TABLES[table]
+        print(f"  📊 Generating {count:,} {table.replace('_', ' ')}...")
+        now = np.datetime64(datetime.now(), 'us')
         
-        # Generate order items (50K records)
-        print("  📊 Generating 50,000 order items...")
-        order_items_data = []
-        for i in range(50000):
-            order_items_data.append((
-                random.randint(1, 20000),
-                random.randint(1, 5000),
-                random.randint(1, 10),
-                round(random.uniform(5, 500), 2)
-            ))
+        def chunks():
+            rng = np.random.default_rng(seed)
+            for start in range(0, count, SAMPLE_CHUNK_ROWS):
+                yield generate(rng, now, start, min(start + SAMPLE_CHUNK_ROWS, count))
         
-        cursor.executemany("""
-            INSERT INTO order_items (order_id, product_id, quantity, price)
-            VALUES (%s, %s, %s, %s)
-        """, order_items_data)
+        cursor = self.connection.cursor()
+        if not (use_infile and self._load_data_local(cursor, table, columns, chunks())):
+            # The prepared cursor keeps the full-batch INSERT prepared across chunks
+            prepared = self.connection.cursor(prepared=True)
+            for rows in chunks():
+                self._bulk_insert(cursor, table, columns, rows, prepared)
+            prepared.close()
         self.connection.commit()
+        cursor.close()
+    
+    def generate_sample_data(self, workers=None, seed=None):
+        """Generate realistic sample data (smaller dataset).
+
+        The tables are independent, so each is generated and loaded by its own
+        worker process over its own connection; workers=1 loads them in-process.
+        Pass a seed to reproduce the same data; by default every run differs.
+        """
+        print("🔄 Generating sample data (fast version)...")
         
-        # Generate posts (10K records)
-        print("  📊 Generating 10,000 posts...")
-        posts_data = []
-        for i in range(10000):
-            posts_data.append((
-                random.randint(1, 10000),
-                f"Post Title {i}",
-                f"This is the content of post {i}. " * random.randint(5, 20),
-                random.choice([True, False]),
-                datetime.now() - timedelta(days=random.randint(1, 365)),
-                random.randint(0, 10000)
-            ))
+        tables = list(SAMPLE_TABLES)
+        # Independent random streams for each table, all derived from one seed
+        seeds = np.random.SeedSequence(seed).spawn(len(tables))
+        workers = workers or min(len(tables), os.cpu_count() or 1)
         
-        cursor.executemany("""
-            INSERT INTO posts (user_id, title, content, published, created_at, view_count)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, posts_data)
-        self.connection.commit()
+        if workers == 1:
+            for table, table_seed in zip(tables, seeds):
+                self.load_table(table, table_seed)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_load_sample_table, repeat(self.config), tables, seeds))
         
-        # Generate logs (100K records)
-        print("  📊 Generating 100,000 log entries...")
-        logs_data = []
-        for i in range(100000):
-            logs_data.append((
-                random.choice(['DEBUG', 'INFO', 'WARN', 'ERROR', 'FATAL']),
-                random.choice(log_messages),
-                random.randint(1, 10000),
-                datetime.now() - timedelta(days=random.randint(1, 30)),
-                json.dumps({"request_id": f"req_{i}", "duration": random.randint(1, 1000)})
-            ))
+        print("✅ Sample data generation complete!")
+    
+    def create_indexes(self):
+        """Create the secondary indexes once the sample data is loaded.
+
+        Building an index over loaded rows is one sort and merge, rather than
+        a B-tree insert per row during the load.
+        """
+        cursor = self.connection.cursor()
         
-        cursor.executemany("""
-            INSERT INTO logs (log_level, message, user_id, created_at, metadata)
-            VALUES (%s, %s, %s, %s, %s)
-        """, logs_data)
-        self.connection.commit()
+        # Create some indexes to make some queries fast, but leave others slow
+        for _ in cursor.execute(";\n".join(SAMPLE_INDEXES), multi=True):
+            pass
         
-        print("✅ Sample data generation complete!")
+        print("✅ Created some indexes (leaving others missing for slow queries)")
     
     def create_slow_queries(self):
         """Create intentionally slow queries for testing."""
@@ -305,14 +525,6 @@ class FastMySQLSetup:
         
         cursor = self.connection.cursor()
         
-        # Create some indexes to make some queries fast, but leave others slow
-        cursor.execute("CREATE INDEX idx_users_email ON users(email)")
-        cursor.execute("CREATE INDEX idx_orders_user_id ON orders(user_id)")
-        cursor.execute("CREATE INDEX idx_products_category_id ON products(category_id)")
-        cursor.execute("CREATE INDEX idx_logs_created_at ON logs(created_at)")
-        
-        print("✅ Created some indexes (leaving others missing for slow queries)")
-        
         # Create a view with slow query examples
         cursor.execute("""
             CREATE VIEW slow_queries_examples AS
@@ -347,17 +559,12 @@ class FastMySQLSetup:
     def update_config(self):
         """Update the observability tool config with the new database."""
         try:
-            with open('config.json', 'r') as f:
-                config = json.load(f)
-            
-            config['mysql']['database'] = 'observability_test'
-            config['mysql']['host'] = self.config['host']
-            config['mysql']['port'] = self.config['port']
-            config['mysql']['user'] = self.config['user']
-            config['mysql']['password'] = self.config['password']
-            
-            with open('config.json', 'w') as f:
-                json.dump(config, f, indent=2)
+            with edit_json() as config:
+                config['mysql']['database'] = 'observability_test'
+                config['mysql']['host'] = self.config['host']
+                config['mysql']['port'] = self.config['port']
+                config['mysql']['user'] = self.config['user']
+                config['mysql']['password'] = self.config['password']
             
             print("✅ Updated config.json with new database settings")
             
@@ -370,6 +577,15 @@ class FastMySQLSetup:
             self.connection.close()
             print("✅ Database connection closed")
 
+def _load_sample_table(config, table, seed):
+    """Worker entry point: load one table over a connection private to this process."""
+    setup = FastMySQLSetup(config['host'], config['port'], config['user'], config['password'])
+    setup.connection = setup._open_connection(config['database'])
+    try:
+        setup.load_table(table, seed)
+    finally:
+        setup.connection.close()
+
 def main():
     """Main setup function."""
     print("🚀 Fast MySQL Database Setup for Observability Testing")
@@ -393,11 +609,19 @@ def main():
         if not setup.create_database():
             return
         
-        if not setup.create_tables():
-            return
-        
-        # Generate sample data
-        setup.generate_sample_data()
+        # Raise packet limits for the load only
+        setup.raise_server_limits()
+        try:
+            if not setup.create_tables():
+                return
+            
+            # Generate sample data
+            setup.generate_sample_data()
+            
+            # Index only after the rows are in
+            setup.create_indexes()
+        finally:
+            setup.restore_server_limits()
         
         # Create slow queries
         setup.create_slow_queries()
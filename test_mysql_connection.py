@@ -6,9 +6,13 @@ This script tests your MySQL connection and shows what data is available.
 """
 
 import mysql.connector
-import json
 from datetime import datetime
 
+from config_io import edit_json
+
+# Tables estimated below this many rows get an exact COUNT(*)
+SMALL_TABLE_ROWS = 10000
+
 def test_mysql_connection():
     """Test MySQL connection and show database info."""
     print("🔍 Testing MySQL Connection")
@@ -56,12 +60,19 @@ def test_mysql_connection():
             tables = [row[0] for row in cursor.fetchall()]
             print(f"📊 Tables: {', '.join(tables)}")
             
-            # Show table sizes
+            # Show table sizes from InnoDB's row estimates instead of a COUNT(*) scan per table
             print("\n📊 Table sizes:")
-            for table in tables:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                count = cursor.fetchone()[0]
-                print(f"  {table}: {count:,} rows")
+            cursor.execute(
+                "SELECT table_name, table_rows FROM information_schema.tables "
+                "WHERE table_schema = 'observability_test' ORDER BY table_name"
+            )
+            for table, estimate in cursor.fetchall():
+                if estimate is None or estimate < SMALL_TABLE_ROWS:
+                    # Small tables are cheap to count exactly
+                    cursor.execute(f"SELECT COUNT(*) FROM `{table}`")
+                    print(f"  {table}: {cursor.fetchone()[0]:,} rows")
+                else:
+                    print(f"  {table}: ~{estimate:,} rows (estimate)")
             
             # Test some queries
             print("\n🔍 Testing some queries:")
@@ -94,17 +105,12 @@ def test_mysql_connection():
         # Update config
         print("\n🔄 Updating config.json...")
         try:
-            with open('config.json', 'r') as f:
-                config = json.load(f)
-            
-            config['mysql']['host'] = host
-            config['mysql']['port'] = port
-            config['mysql']['user'] = user
-            config['mysql']['password'] = password
-            config['mysql']['database'] = 'observability_test' if 'observability_test' in databases else 'mysql'
-            
-            with open('config.json', 'w') as f:
-                json.dump(config, f, indent=2)
+            with edit_json() as config:
+                config['mysql']['host'] = host
+                config['mysql']['port'] = port
+                config['mysql']['user'] = user
+                config['mysql']['password'] = password
+                config['mysql']['database'] = 'observability_test' if 'observability_test' in databases else 'mysql'
             
             print("✅ Updated config.json with your MySQL settings")
             